@@ -0,0 +1,129 @@
+"""Device-free benchmarks for the noise generators in brown_noise_player.
+
+Each configuration builds a BrownNoisePlayer on a NullBackend and calls its
+audio_callback directly with a synthetic ``outdata`` buffer. Per-block times
+are reported as a fraction of the real-time deadline (``block_size /
+sample_rate``). Results are written as JSON and can be compared against a
+stored baseline to catch regressions:
+
+    python bench_noise.py --output bench.json --save-baseline
+    python bench_noise.py --output bench.json --baseline bench_baseline.json
+"""
+import argparse
+import json
+import platform
+import sys
+
+import numpy as np
+
+from brown_noise_player import (GENERATORS, BrownNoisePlayer, NullBackend,
+                                measure_callback)
+
+BLOCK_SIZES = [64, 128, 256, 512, 1024, 2048]
+SAMPLE_RATES = [44100, 48000, 96000]
+PERCENTILES = [50, 90, 99]
+
+
+def bench_callback(wave_type, sample_rate, block_size, channels=1, blocks=500,
+                   warmup=20):
+    """Time ``blocks`` callbacks and return their deadline-fraction stats."""
+    player = BrownNoisePlayer(sample_rate=sample_rate, block_size=block_size,
+                              channels=channels, seed=0, idle_timeout=None,
+                              backend=NullBackend(realtime=False))
+    try:
+        player.set_wave_type(wave_type)
+        player.start()
+        times = measure_callback(player, blocks, warmup)
+    finally:
+        player.close()
+
+    fractions = times / (block_size / sample_rate)
+    stats = {
+        'mean_us': float(times.mean() * 1e6),
+        'mean': float(fractions.mean()),
+        'max': float(fractions.max()),
+    }
+    for p, value in zip(PERCENTILES, np.percentile(fractions, PERCENTILES)):
+        stats[f'p{p}'] = float(value)
+    return stats
+
+
+def run(waves, sample_rates, block_sizes, channels=1, blocks=500, warmup=20):
+    results = {}
+    for wave_type in waves:
+        for sample_rate in sample_rates:
+            for block_size in block_sizes:
+                key = f"{wave_type}/{sample_rate}/{block_size}"
+                results[key] = bench_callback(wave_type, sample_rate,
+                                              block_size, channels, blocks,
+                                              warmup)
+                stats = results[key]
+                print(f"{key:<24} {stats['mean_us']:9.1f} us  "
+                      f"p50 {stats['p50']:7.2%}  p99 {stats['p99']:7.2%}  "
+                      f"max {stats['max']:7.2%}")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return ``(key, baseline_p50, p50)`` for every regressed configuration.
+
+    The median is compared because it is far less noisy than the tail; a
+    configuration regresses when it is more than ``tolerance`` slower.
+    """
+    regressions = []
+    for key, stats in results.items():
+        old = baseline.get(key)
+        if old is not None and stats['p50'] > old['p50'] * (1 + tolerance):
+            regressions.append((key, old['p50'], stats['p50']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--waves', nargs='+', default=list(GENERATORS),
+                        choices=list(GENERATORS))
+    parser.add_argument('--sample-rates', nargs='+', type=int,
+                        default=SAMPLE_RATES)
+    parser.add_argument('--block-sizes', nargs='+', type=int,
+                        default=BLOCK_SIZES)
+    parser.add_argument('--channels', type=int, default=1)
+    parser.add_argument('--blocks', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--output', default='bench_output.json')
+    parser.add_argument('--baseline', default='bench_baseline.json')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="also store these results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed median slowdown before failing")
+    args = parser.parse_args(argv)
+
+    results = run(args.waves, args.sample_rates, args.block_sizes,
+                  args.channels, args.blocks, args.warmup)
+    report = {
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'channels': args.channels,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return 0
+
+    try:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; use --save-baseline to create one")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for key, old, new in regressions:
+        print(f"REGRESSION {key}: p50 {old:.2%} -> {new:.2%} of deadline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,124 +1,1762 @@
+import argparse
+import bisect
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import struct
+import time
+import wave
+from collections import deque
+from multiprocessing import shared_memory
+from queue import Empty, Full
+
 import numpy as np
-import sounddevice as sd
-import tkinter as tk
-from tkinter import ttk
+try:
+    import sounddevice as sd
+    _sd_error = None
+except OSError as exc:  # PortAudio is missing; only NullBackend can be used
+    sd = None
+    _sd_error = exc
 import threading
 
+# Brown noise is a leaky integrator of white noise:
+#     y[n] = (y[n-1] + 0.02 * w[n]) / 1.02
+BROWN_DECAY = 1 / 1.02
+BROWN_INPUT = 0.02 / 1.02
+BROWN_GAIN = 3.5
+
+
+class BrownFilter:
+    """Block-vectorized one-pole IIR used for brown noise.
+
+    Each chunk of ``chunk_size`` samples is solved in closed form with a
+    cumulative sum, so a block costs a handful of numpy calls instead of one
+    interpreter iteration per sample. ``state`` carries ``y[n-1]`` across
+    calls, giving the same output as running the recurrence sample by sample.
+    All work happens in preallocated ``dtype`` buffers. A ``(frames,
+    channels)`` input filters every channel at once with one state per column.
+    """
+
+    def __init__(self, chunk_size=256, dtype=np.float32, channels=1):
+        self.chunk_size = chunk_size
+        self.dtype = dtype
+        self.channels = channels
+        self.state = np.zeros(channels)
+        # One column per channel: an in-place multiply by a broadcast
+        # (chunk, 1) column makes numpy allocate a temporary.
+        k = np.repeat(np.arange(chunk_size)[:, None], channels, axis=1)
+        # y[k] = a**k * (cumsum(b * w[i] * a**-i) + a * y[-1])
+        self._decay = (BROWN_DECAY ** k).astype(dtype)
+        self._weights = (BROWN_INPUT * BROWN_DECAY ** -k).astype(dtype)
+        self._acc = np.empty((chunk_size, channels), dtype=dtype)
+        self._carry = np.empty(channels, dtype=dtype)
+
+    def reset(self):
+        self.state.fill(0)
+
+    def process(self, white, out=None):
+        if out is None:
+            out = np.empty(white.shape, dtype=self.dtype)
+        x, y = white, out
+        if white.ndim == 1:
+            x, y = white[:, None], out[:, None]
+        if x.shape[1] != self.channels:
+            raise ValueError(f"expected {self.channels} channels, got {x.shape[1]}")
+        for start in range(0, len(x), self.chunk_size):
+            chunk = x[start:start + self.chunk_size]
+            n = len(chunk)
+            acc = self._acc[:n]
+            np.multiply(chunk, self._weights[:n], out=acc)
+            # Adding a * y[-1] to the first row lets cumsum carry it to every
+            # row without a broadcast add (which allocates for several
+            # channels).
+            np.multiply(self.state, BROWN_DECAY, out=self._carry)
+            acc[0] += self._carry
+            np.cumsum(acc, axis=0, out=acc)
+            np.multiply(acc, self._decay[:n], out=y[start:start + n])
+            self.state[:] = y[start + n - 1]
+        return out
+
+
+def brown_reference(white, state=0.0):
+    """Scalar reference for :class:`BrownFilter`; returns ``(out, state)``."""
+    out = np.empty(len(white))
+    for i, w in enumerate(white):
+        state = (state + 0.02 * w) / 1.02
+        out[i] = state
+    return out, state
+
+
+class _Generator:
+    """Base for the wave generators.
+
+    ``render`` fills a float32 block in place; the block is either
+    ``(frames,)`` or ``(frames, channels)`` with one independent stream per
+    channel.
+    """
+
+    def __init__(self, rng, sample_rate, block_size, channels=1):
+        self.rng = rng
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._scratch = np.empty(block_size * channels, dtype=np.float32)
+
+    def scratch(self, shape):
+        # Grows only if a caller asks for more than block_size frames.
+        size = int(np.prod(shape))
+        if len(self._scratch) < size:
+            self._scratch = np.empty(size, dtype=np.float32)
+        return self._scratch[:size].reshape(shape)
+
+    def reset(self):
+        pass
+
+    def params(self):
+        """Values that change the rendered signal, used to key cached tables."""
+        return {}
+
+    def spawn(self, rng, block_size):
+        """Return a mono generator with the same parameters, drawing from ``rng``."""
+        return type(self)(rng, self.sample_rate, block_size)
+
+    def render(self, out):
+        raise NotImplementedError
+
+
+class BrownGenerator(_Generator):
+    def __init__(self, rng, sample_rate, block_size, channels=1):
+        super().__init__(rng, sample_rate, block_size, channels)
+        self.filter = BrownFilter(channels=channels)
+
+    def reset(self):
+        self.filter.reset()
+
+    def params(self):
+        return {'decay': BROWN_DECAY, 'input': BROWN_INPUT, 'gain': BROWN_GAIN}
+
+    def render(self, out):
+        white = self.scratch(out.shape)
+        self.rng.standard_normal(dtype=np.float32, out=white)
+        self.filter.process(white, out=out)
+        out *= BROWN_GAIN
+
+
+class WhiteGenerator(_Generator):
+    def params(self):
+        return {'scale': 0.1}
+
+    def render(self, out):
+        self.rng.standard_normal(dtype=np.float32, out=out)
+        out *= 0.1
+
+
+class OscillatorBank(_Generator):
+    """Wavetable oscillator bank with wrapped phase accumulators.
+
+    Every voice has its own frequency and amplitude, and optionally a
+    channel (for example the two sides of a binaural beat); voices without one
+    play on every channel. All voices are rendered in one vectorized pass over
+    a ``(frames, voices)`` phase matrix and mixed into ``out`` with a single
+    matrix product. Phases are kept in cycles and wrapped to ``[0, 1)`` after
+    every block, so precision does not degrade over long sessions.
+    """
+
+    TABLE_SIZE = 4096
+    # One guard point so index + 1 never runs off the end of the table.
+    TABLE = np.sin(2 * np.pi * np.arange(TABLE_SIZE + 1) / TABLE_SIZE)
+
+    def __init__(self, rng, sample_rate, block_size, channels=1,
+                 voices=((440, 1.0),)):
+        super().__init__(rng, sample_rate, block_size, channels)
+        self.block_size = block_size
+        self.set_voices(voices)
+
+    def set_voices(self, voices):
+        """Replace the voices with ``(frequency, amplitude[, channel])``."""
+        self.voices = tuple(
+            (float(v[0]), float(v[1]), v[2] if len(v) > 2 else None)
+            for v in voices
+        )
+        # Build the whole state first and swap it in with one assignment so a
+        # concurrent render never sees mismatched arrays.
+        self._state = self._allocate(self.block_size)
+
+    def _allocate(self, frames):
+        count = len(self.voices)
+        freqs = np.array([f for f, _, _ in self.voices], dtype=np.float64)
+        mix = np.zeros((count, self.channels))
+        for v, (_, amp, channel) in enumerate(self.voices):
+            if channel is None:
+                mix[v, :] = amp
+            else:
+                mix[v, channel % self.channels] = amp
+        return {
+            'inc': freqs / self.sample_rate,
+            'mix': mix,
+            'phases': np.zeros(count),
+            'step': np.empty(count),
+            'ramp': np.arange(frames, dtype=np.float64)[:, None],
+            'phase': np.empty((frames, count)),
+            'floor': np.empty((frames, count)),
+            'index': np.empty((frames, count), dtype=np.intp),
+            'next': np.empty((frames, count), dtype=np.intp),
+            'lo': np.empty((frames, count)),
+            'hi': np.empty((frames, count)),
+            # float64 mix target; matmul straight into float32 ``out`` would
+            # allocate a casting buffer on every block.
+            'mixed': np.empty((frames, self.channels)),
+        }
+
+    def reset(self):
+        self._state['phases'].fill(0)
+
+    def params(self):
+        return {'voices': self.voices, 'table': self.TABLE_SIZE}
+
+    def spawn(self, rng, block_size):
+        return type(self)(rng, self.sample_rate, block_size, voices=self.voices)
+
+    def render(self, out):
+        n = len(out)
+        st = self._state
+        if len(st['ramp']) < n:
+            phases = st['phases'].copy()
+            st = self._state = self._allocate(n)
+            st['phases'][:] = phases
+        ph, fl, idx, nxt = st['phase'][:n], st['floor'][:n], st['index'][:n], st['next'][:n]
+        lo, hi = st['lo'][:n], st['hi'][:n]
+
+        np.multiply(st['ramp'][:n], st['inc'], out=ph)
+        ph += st['phases']
+        ph *= self.TABLE_SIZE
+        np.remainder(ph, self.TABLE_SIZE, out=ph)
+        np.floor(ph, out=fl)
+        np.copyto(idx, fl, casting='unsafe')
+        np.add(idx, 1, out=nxt)
+        np.subtract(ph, fl, out=ph)  # fractional part
+        # mode='raise' buffers ``out``; indices are always in range anyway.
+        np.take(self.TABLE, idx, out=lo, mode='clip')
+        np.take(self.TABLE, nxt, out=hi, mode='clip')
+        hi -= lo
+        hi *= ph
+        lo += hi
+        mixed = st['mixed'][:n]
+        np.matmul(lo, st['mix'], out=mixed)
+        np.copyto(out[:, None] if out.ndim == 1 else out, mixed, casting='same_kind')
+
+        np.multiply(st['inc'], n, out=st['step'])
+        st['phases'] += st['step']
+        np.remainder(st['phases'], 1.0, out=st['phases'])
+
+
+class SineGenerator(OscillatorBank):
+    """Single 440 Hz tone, kept as the ``'Sine'`` wave type."""
+
+
+class SpectralNoiseGenerator(_Generator):
+    """Colored noise made by shaping white noise with an FFT overlap-add FIR.
+
+    The spectrum is either a tilt in dB per octave (-3 for pink, +3 for blue,
+    +6 for violet) or any ``shape`` callable mapping frequencies in Hz to a
+    linear magnitude. Each block is convolved in one FFT pass over all
+    channels, and the convolution tail carries over to the next block.
+    """
+
+    TILT = 0.0
+    TAPS = 2048
+    LEVEL = 0.2
+
+    def __init__(self, rng, sample_rate, block_size, channels=1, tilt=None,
+                 shape=None):
+        super().__init__(rng, sample_rate, block_size, channels)
+        self._buffers = {}
+        self.set_spectrum(self.TILT if tilt is None else tilt, shape)
+
+    def set_spectrum(self, tilt=0.0, shape=None):
+        self.tilt = tilt
+        self.shape = shape
+        freqs = np.fft.rfftfreq(self.TAPS, 1 / self.sample_rate)
+        if shape is not None:
+            mag = np.asarray(shape(freqs), dtype=np.float64)
+        else:
+            mag = np.zeros_like(freqs)
+            # |H(f)| = (f / 1 kHz) ** (tilt / 6.02), no DC.
+            mag[1:] = (freqs[1:] / 1000.0) ** (tilt / (20 * np.log10(2)))
+        kernel = np.roll(np.fft.irfft(mag, self.TAPS), self.TAPS // 2)
+        kernel *= np.hanning(self.TAPS)
+        # Unit-variance white noise in gives LEVEL RMS out.
+        kernel *= self.LEVEL / np.sqrt(np.sum(kernel ** 2))
+        self.kernel = kernel
+        self._spectra = {}
+        self._tail = np.zeros((self.TAPS - 1, self.channels))
+
+    def reset(self):
+        self._tail.fill(0)
+
+    def params(self):
+        digest = hashlib.sha1(self.kernel.tobytes()).hexdigest()
+        return {'kernel': digest}
+
+    def spawn(self, rng, block_size):
+        return type(self)(rng, self.sample_rate, block_size, tilt=self.tilt,
+                          shape=self.shape)
+
+    def _spectrum(self, nfft):
+        spectrum = self._spectra.get(nfft)
+        if spectrum is None:
+            # One column per channel: multiplying in place by a broadcast
+            # (bins, 1) column makes numpy allocate a temporary.
+            spectrum = np.repeat(np.fft.rfft(self.kernel, nfft)[:, None],
+                                 self.channels, axis=1)
+            self._spectra[nfft] = spectrum
+        return spectrum
+
+    def _fft_buffers(self, nfft):
+        # Zero-padded input, spectrum and output, reused through np.fft's
+        # ``out=`` (NumPy >= 2.0) so a block allocates nothing.
+        buffers = self._buffers.get(nfft)
+        if buffers is None:
+            buffers = (
+                np.zeros((nfft, self.channels)),
+                np.empty((nfft // 2 + 1, self.channels), dtype=np.complex128),
+                np.empty((nfft, self.channels)),
+            )
+            self._buffers[nfft] = buffers
+        return buffers
+
+    def render(self, out):
+        y = out if out.ndim == 2 else out[:, None]
+        n = len(y)
+        white = self.scratch(y.shape)
+        self.rng.standard_normal(dtype=np.float32, out=white)
+        nfft = 1 << (n + self.TAPS - 2).bit_length()
+        padded, shaped, full = self._fft_buffers(nfft)
+        padded[:n] = white
+        padded[n:] = 0
+        np.fft.rfft(padded, axis=0, out=shaped)
+        shaped *= self._spectrum(nfft)
+        np.fft.irfft(shaped, nfft, axis=0, out=full)
+        full[:self.TAPS - 1] += self._tail
+        y[:] = full[:n]
+        self._tail[:] = full[n:n + self.TAPS - 1]
+
+
+class PinkGenerator(SpectralNoiseGenerator):
+    TILT = -3.0
+
+
+class BlueGenerator(SpectralNoiseGenerator):
+    TILT = 3.0
+
+
+class VioletGenerator(SpectralNoiseGenerator):
+    TILT = 6.0
+
+
+class LoopTable:
+    """Plays a seamlessly looping table; ``render`` is just an indexed copy.
+
+    For multichannel blocks each channel reads the table at an evenly spaced
+    offset, which keeps the channels uncorrelated.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.pos = 0
+
+    def reset(self):
+        self.pos = 0
+
+    def render(self, out):
+        size = len(self.table)
+        if out.ndim == 1:
+            self._copy(out, self.pos)
+        else:
+            channels = out.shape[1]
+            for c in range(channels):
+                self._copy(out[:, c], self.pos + c * size // channels)
+        self.pos = (self.pos + len(out)) % size
+
+    def _copy(self, out, pos):
+        n = len(out)
+        size = len(self.table)
+        pos %= size
+        done = 0
+        while done < n:
+            take = min(n - done, size - pos)
+            out[done:done + take] = self.table[pos:pos + take]
+            done += take
+            pos = (pos + take) % size
+
+
+class LoopCache:
+    """On-disk cache of loopable noise tables, read back through ``np.memmap``.
+
+    Each table holds ``loop_seconds`` of a generator's output with the seam
+    crossfaded so it can repeat without a click. Files are keyed by wave type,
+    sample rate and a digest of the generator parameters, so changing a
+    parameter picks a fresh table. The least recently used tables are deleted
+    once the directory exceeds ``max_bytes``.
+    """
+
+    VERSION = 1
+
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024,
+                 loop_seconds=30.0, crossfade_seconds=0.5, chunk_size=65536):
+        if directory is None:
+            directory = os.path.join(os.path.expanduser('~'), '.cache',
+                                     'codex-noise')
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.loop_seconds = loop_seconds
+        self.crossfade_seconds = crossfade_seconds
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+
+    def _key(self, wave_type, sample_rate, generator):
+        params = dict(generator.params(), version=self.VERSION,
+                      loop=self.loop_seconds, fade=self.crossfade_seconds)
+        digest = hashlib.sha1(repr(sorted(params.items())).encode()).hexdigest()
+        return f"{wave_type}-{sample_rate}-{digest[:12]}.f32"
+
+    def path(self, wave_type, sample_rate, generator=None):
+        if generator is None:
+            generator = GENERATORS[wave_type](None, sample_rate, 0)
+        return os.path.join(self.directory,
+                            self._key(wave_type, sample_rate, generator))
+
+    def table(self, wave_type, sample_rate, seed=None, generator=None):
+        """Return a read-only memmap of the table, building it if needed.
+
+        ``generator`` is the one the table stands in for (by default a
+        ``wave_type`` generator with default parameters); the table is keyed
+        on its ``params()`` and rendered by a copy of it.
+        """
+        if generator is None:
+            generator = GENERATORS[wave_type](None, sample_rate, 0)
+        path = self.path(wave_type, sample_rate, generator)
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            self._build(path, wave_type, sample_rate, seed, generator)
+            self._invalidate(path, wave_type, sample_rate)
+            self.evict(keep=path)
+        return np.memmap(path, dtype=np.float32, mode='r')
+
+    def _build(self, path, wave_type, sample_rate, seed, generator):
+        size = int(self.loop_seconds * sample_rate)
+        fade = min(int(self.crossfade_seconds * sample_rate), size)
+        generator = generator.spawn(np.random.default_rng(seed), self.chunk_size)
+        tmp = path + '.tmp'
+        table = np.memmap(tmp, dtype=np.float32, mode='w+', shape=(size,))
+        for start in range(0, size, self.chunk_size):
+            generator.render(table[start:start + self.chunk_size])
+        # Blend the signal that would follow the loop into its head, so the
+        # last sample flows straight into the first one.
+        tail = np.empty(fade, dtype=np.float32)
+        generator.render(tail)
+        x = np.linspace(0, np.pi / 2, fade, dtype=np.float32)
+        if wave_type == 'Sine':
+            # Coherent signals need a linear fade to keep a constant level.
+            fade_in = x / (np.pi / 2)
+            fade_out = 1 - fade_in
+        else:
+            # Equal-power fade for uncorrelated noise.
+            fade_in, fade_out = np.sin(x), np.cos(x)
+        head = table[:fade]
+        head *= fade_in
+        head += tail * fade_out
+        table.flush()
+        del table
+        os.replace(tmp, path)
+
+    def _invalidate(self, path, wave_type, sample_rate):
+        # Tables rendered with older generator parameters can never be hit.
+        prefix = f"{wave_type}-{sample_rate}-"
+        for name in os.listdir(self.directory):
+            full = os.path.join(self.directory, name)
+            if name.startswith(prefix) and full != path:
+                self._remove(full)
+
+    def evict(self, keep=None):
+        """Delete least recently used tables until under ``max_bytes``."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.f32'):
+                full = os.path.join(self.directory, name)
+                st = os.stat(full)
+                entries.append((st.st_mtime, st.st_size, full))
+        total = sum(size for _, size, _ in entries)
+        for _, size, full in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if full != keep and self._remove(full):
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:  # still mapped elsewhere, e.g. on Windows
+            return False
+        return True
+
+
+class RingBuffer:
+    """Preallocated single-producer sample ring with one or more readers.
+
+    ``write_pos`` is only advanced by the producer and each entry of
+    ``read_pos`` only by its own reader, so no side needs a lock. The producer
+    waits for the slowest reader, so several outputs can share one rendered
+    stream.
+    """
+
+    def __init__(self, capacity, channels=1, readers=1):
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, channels), dtype=np.float32)
+        self.write_pos = 0
+        self.read_pos = [0] * readers
+
+    def readable(self, reader=0):
+        return self.write_pos - self.read_pos[reader]
+
+    def writable(self):
+        return self.capacity - (self.write_pos - min(self.read_pos))
+
+    def write(self, data):
+        """Append ``data``; the caller must check :meth:`writable` first."""
+        n = len(data)
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.buffer[start:start + first] = data[:first]
+        self.buffer[:n - first] = data[first:]
+        self.write_pos += n
+
+    def read_into(self, out, reader=0):
+        """Copy up to ``len(out)`` frames into ``out`` and return the count."""
+        n = min(len(out), self.readable(reader))
+        start = self.read_pos[reader] % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self.buffer[start:start + first]
+        out[first:n] = self.buffer[:n - first]
+        self.read_pos[reader] += n
+        return n
+
+
+class SharedRing(RingBuffer):
+    """Single-reader RingBuffer in ``multiprocessing.shared_memory``.
+
+    The segment starts with an int64 header ``[write_pos, read_pos,
+    heartbeat]`` followed by the float32 samples. As in RingBuffer each
+    position has exactly one writer, and the samples are copied before the
+    position is stored, so the handoff between processes is a single aligned
+    64-bit store with no lock. The producer bumps ``heartbeat`` on every loop
+    so a watchdog can tell it is still alive.
+
+    Pass ``name`` to attach to a segment created by another process; only the
+    creator unlinks it on close.
+    """
+
+    HEADER = 3
+
+    def __init__(self, capacity, channels=1, name=None):
+        size = 8 * self.HEADER + 4 * capacity * channels
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner,
+                                              size=size if self.owner else 0)
+        self.capacity = capacity
+        self.header = np.ndarray((self.HEADER,), dtype=np.int64,
+                                 buffer=self.shm.buf)
+        self.buffer = np.ndarray((capacity, channels), dtype=np.float32,
+                                 buffer=self.shm.buf, offset=8 * self.HEADER)
+        # A one-element view, so RingBuffer's read_pos[reader] code applies.
+        self.read_pos = self.header[1:2]
+        if self.owner:
+            self.header.fill(0)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def write_pos(self):
+        return int(self.header[0])
+
+    @write_pos.setter
+    def write_pos(self, value):
+        self.header[0] = value
+
+    @property
+    def heartbeat(self):
+        return int(self.header[2])
+
+    def beat(self):
+        self.header[2] += 1
+
+    def close(self):
+        # The views must go before the mapping can be closed.
+        del self.header, self.buffer, self.read_pos
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+GENERATORS = {
+    'Brown': BrownGenerator,
+    'White': WhiteGenerator,
+    'Sine': SineGenerator,
+    'Pink': PinkGenerator,
+    'Blue': BlueGenerator,
+    'Violet': VioletGenerator,
+}
+
+
+def render(path, wave_type='Brown', duration=60.0, sample_rate=44100,
+           gain=1.0, fmt=None, chunk_size=None, seed=None, channels=1):
+    """Render ``duration`` seconds of noise to ``path`` without an audio device.
+
+    ``fmt`` is ``'wav'`` (16-bit PCM) or ``'raw'`` (float32 PCM written through
+    ``np.memmap``); by default it follows the file extension. Audio is produced
+    ``chunk_size`` frames (65536 by default) at a time, so memory use does not
+    grow with the duration. Multichannel output is interleaved with an
+    independent stream per channel. Returns the throughput in samples per
+    second.
+
+    Brown noise is rendered by :func:`render_brown` with one worker, so it
+    uses the same per-chunk PRNG streams (and ``chunk_size`` defaults to
+    2**20 as there) and the file is identical for any number of workers.
+    """
+    if wave_type == 'Brown':
+        return render_brown(path, duration, sample_rate, gain, fmt,
+                            chunk_size or 1 << 20, seed, channels, workers=1)
+    chunk_size = chunk_size or 65536
+    if fmt is None:
+        fmt = 'wav' if path.lower().endswith('.wav') else 'raw'
+    total = int(round(duration * sample_rate))
+    generator = GENERATORS[wave_type](np.random.default_rng(seed), sample_rate,
+                                      chunk_size, channels)
+    chunk = np.empty((chunk_size, channels), dtype=np.float32)
+    pcm = np.empty((chunk_size, channels), dtype='<i2')
+
+    started = time.perf_counter()
+    if fmt == 'wav':
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(channels)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            for start in range(0, total, chunk_size):
+                n = min(chunk_size, total - start)
+                data = chunk[:n]
+                generator.render(data)
+                np.multiply(data, gain * 32767, out=data)
+                np.clip(data, -32767, 32767, out=data)
+                pcm[:n] = data
+                wav.writeframes(pcm[:n].tobytes())
+    elif fmt == 'raw':
+        out = np.memmap(path, dtype=np.float32, mode='w+',
+                        shape=(max(total, 1), channels))
+        for start in range(0, total, chunk_size):
+            data = out[start:start + chunk_size]
+            generator.render(data)
+            np.multiply(data, gain, out=data)
+            np.clip(data, -1, 1, out=data)
+        out.flush()
+        del out
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+    elapsed = time.perf_counter() - started
+    total *= channels
+    return total / elapsed if elapsed > 0 else float('inf')
+
+
+# Frames at the start of each parallel chunk that depend on the carry-in.
+# BROWN_DECAY ** CARRY_FRAMES is about 1e-35, far below float64 resolution,
+# so later frames are final as soon as the chunk is filtered from rest.
+CARRY_FRAMES = 4096
+WAV_HEADER = 44
+
+
+def _brown_chunk(seed, index, frames, channels):
+    """Brown noise for chunk ``index`` filtered from rest, in float64.
+
+    Chunk ``index`` always draws from ``PCG64(seed).jumped(index)``, so it
+    comes out the same whichever process renders it.
+    """
+    rng = np.random.Generator(np.random.PCG64(seed).jumped(index))
+    white = rng.standard_normal((frames, channels))
+    return BrownFilter(dtype=np.float64, channels=channels).process(white)
+
+
+def _write_frames(path, fmt, start, samples, gain):
+    """Scale, clip and store float64 ``samples`` at frame ``start`` of ``path``."""
+    channels = samples.shape[1]
+    data = samples * (BROWN_GAIN * gain)
+    if fmt == 'wav':
+        data *= 32767
+        np.clip(data, -32767, 32767, out=data)
+        out = np.memmap(path, dtype='<i2', mode='r+', shape=samples.shape,
+                        offset=WAV_HEADER + 2 * channels * start)
+    else:
+        np.clip(data, -1, 1, out=data)
+        out = np.memmap(path, dtype=np.float32, mode='r+', shape=samples.shape,
+                        offset=4 * channels * start)
+    out[:] = data
+    out.flush()
+    del out
+
+
+def _render_brown_chunk(path, fmt, seed, index, start, frames, channels, gain):
+    # Everything after the carry-in region is written here; the parent fixes
+    # up the head once the carries are known.
+    y = _brown_chunk(seed, index, frames, channels)
+    head = min(frames, CARRY_FRAMES)
+    if head < frames:
+        _write_frames(path, fmt, start + head, y[head:], gain)
+    # Copies, so the rest of the chunk can be freed as soon as this returns.
+    return y[:head].copy(), y[-1].copy()
+
+
+def _in_order(pool, function, tasks, ahead):
+    """Yield ``function(*task)`` results in order, ``ahead`` tasks in flight.
+
+    Unlike ``pool.map``, which submits everything up front and holds every
+    finished result until it is consumed, memory stays bounded by ``ahead``.
+    """
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(function, *task))
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def render_brown(path, duration=60.0, sample_rate=44100, gain=1.0, fmt=None,
+                 chunk_size=1 << 20, seed=None, channels=1, workers=None):
+    """Render brown noise to ``path`` on a pool of ``workers`` processes.
+
+    The recurrence is linear, so each ``chunk_size`` chunk is filtered from
+    rest in parallel with its own jumped PRNG stream, and the state carried
+    in from the previous chunk ``c`` is added afterwards in closed form as
+    ``BROWN_DECAY ** (k + 1) * c``. Only the first ``CARRY_FRAMES`` of a
+    chunk are affected, so the parent does that serially while workers write
+    the rest of the file directly. The output depends only on ``seed`` and
+    ``chunk_size``: ``workers=1`` renders the same samples in-process. It
+    matches filtering the same white noise in one pass with BrownFilter to
+    float64 rounding. ``fmt`` is as for :func:`render`; returns samples/s.
+    """
+    if fmt is None:
+        fmt = 'wav' if path.lower().endswith('.wav') else 'raw'
+    if fmt not in ('wav', 'raw'):
+        raise ValueError(f"Unknown format: {fmt}")
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    total = int(round(duration * sample_rate))
+    chunk_size = max(chunk_size, 1)
+
+    started = time.perf_counter()
+    if fmt == 'wav':
+        # Write the header for the final size up front so every worker can
+        # map its own region of the file.
+        data_size = 2 * channels * total
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + data_size,
+                                b'WAVE', b'fmt ', 16, 1, channels, sample_rate,
+                                2 * channels * sample_rate, 2 * channels, 16,
+                                b'data', data_size))
+        size = WAV_HEADER + data_size
+    else:
+        open(path, 'wb').close()
+        size = 4 * channels * max(total, 1)
+    with open(path, 'r+b') as f:
+        f.truncate(size)
+
+    tasks = [(path, fmt, seed, index, start, min(chunk_size, total - start),
+              channels, gain)
+             for index, start in enumerate(range(0, total, chunk_size))]
+    # Carries are applied as chunks finish, in order, so only a few chunks
+    # are held in memory whatever the duration.
+    if workers == 1:
+        pool = contextlib.nullcontext()
+        results = (_render_brown_chunk(*task) for task in tasks)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'))
+        ahead = 2 * (workers or os.cpu_count() or 1)
+        results = _in_order(pool, _render_brown_chunk, tasks, ahead)
+    with pool:
+        carry = np.zeros(channels)
+        for task, (head, last) in zip(tasks, results):
+            start, frames = task[4], task[5]
+            k = np.arange(1, len(head) + 1)[:, None]
+            head += BROWN_DECAY ** k * carry
+            _write_frames(path, fmt, start, head, gain)
+            carry = last + BROWN_DECAY ** frames * carry
+    elapsed = time.perf_counter() - started
+    total *= channels
+    return total / elapsed if elapsed > 0 else float('inf')
+
+
+class ControlQueue:
+    """Preallocated single-producer/single-consumer command queue.
+
+    The UI thread pushes ``(command, value)`` pairs and the audio thread pops
+    them once per block. ``head`` is only advanced by the producer and
+    ``tail`` only by the consumer, so neither side takes a lock and popping
+    never allocates. A push to a full queue is dropped and sets
+    ``overflowed``, which tells the consumer to catch up with the latest
+    state once it has emptied the queue.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self.head = 0
+        self.tail = 0
+        self.overflowed = False
+
+    def push(self, command, value=None):
+        """Queue a command; returns False if the queue is full."""
+        if self.head - self.tail >= self.capacity:
+            self.overflowed = True
+            return False
+        self._slots[self.head % self.capacity] = (command, value)
+        self.head += 1
+        return True
+
+    def pop(self):
+        if self.tail == self.head:
+            return None
+        item = self._slots[self.tail % self.capacity]
+        self.tail += 1
+        return item
+
+
+class Telemetry:
+    """Callback statistics that are safe to record on the audio thread.
+
+    The callback only bumps counters and preallocated histogram buckets of
+    callback duration, measured as a fraction of the block deadline.
+    ``snapshot`` and ``dump`` are for other threads such as the UI.
+    """
+
+    # Upper bucket edges as fractions of the deadline; the last bucket is
+    # everything slower than the deadline itself.
+    EDGES = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 1.0)
+
+    def __init__(self):
+        self.histogram = np.zeros(len(self.EDGES) + 1, dtype=np.int64)
+        self.reset()
+
+    def reset(self):
+        self.histogram.fill(0)
+        self.callbacks = 0
+        self.underflows = 0
+        self.overflows = 0
+        self.max_load = 0.0
+        self.total_load = 0.0
+
+    def record_status(self, status):
+        if status.output_underflow:
+            self.underflows += 1
+        if status.output_overflow:
+            self.overflows += 1
+
+    def record(self, duration, deadline):
+        load = duration / deadline
+        self.histogram[bisect.bisect_left(self.EDGES, load)] += 1
+        self.callbacks += 1
+        self.total_load += load
+        if load > self.max_load:
+            self.max_load = load
+
+    def snapshot(self):
+        callbacks = self.callbacks
+        edges = [*self.EDGES, None]
+        return {
+            'time': time.time(),
+            'callbacks': callbacks,
+            'underflows': self.underflows,
+            'overflows': self.overflows,
+            'mean_load': self.total_load / callbacks if callbacks else 0.0,
+            'max_load': self.max_load,
+            'histogram': [[edge, int(count)]
+                          for edge, count in zip(edges, self.histogram)],
+        }
+
+    def dump(self, path):
+        """Append a snapshot to ``path`` as one JSON line."""
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.snapshot()) + '\n')
+
+
+class NullOutputStream:
+    """Stand-in for ``sd.OutputStream`` that never touches an audio device.
+
+    With ``realtime`` a thread calls the callback at the pace of a real
+    device while the stream is started; otherwise it never calls back and the
+    caller drives the callback directly.
+    """
+
+    def __init__(self, samplerate=44100, blocksize=1024, channels=1,
+                 dtype='float32', device=None, callback=None, latency=None,
+                 realtime=True, **kwargs):
+        self.samplerate = samplerate
+        self.blocksize = blocksize or 1024
+        self.channels = channels
+        self.device = device
+        self.callback = callback
+        self.realtime = realtime
+        self.latency = latency or 0.0
+        self.active = False
+        self.closed = False
+        self._thread = None
+
+    def _run(self):
+        out = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+        period = self.blocksize / self.samplerate
+        deadline = time.perf_counter()
+        while self.active:
+            self.callback(out, self.blocksize, None, None)
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def start(self):
+        if self.active:
+            return
+        self.active = True
+        if self.realtime:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self.active = False
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def close(self):
+        self.stop()
+        self.closed = True
+
+
+class NullBackend:
+    """Audio backend that plays into nothing, for benchmarks and headless use."""
+
+    def __init__(self, realtime=True):
+        self.realtime = realtime
+
+    def OutputStream(self, **kwargs):
+        return NullOutputStream(realtime=self.realtime, **kwargs)
+
+
+class DeviceCache:
+    """Output devices, queried on a background thread and cached.
+
+    Creating the cache starts the first query immediately, so callers such as
+    the UI can build their widgets without waiting for the audio backend.
+    """
+
+    def __init__(self):
+        self._devices = []
+        self.ready = threading.Event()
+        self.refresh()
+
+    def refresh(self):
+        """Re-query the audio backend in the background."""
+        self.ready.clear()
+        threading.Thread(target=self._query, daemon=True).start()
+
+    def _query(self):
+        try:
+            if sd is None:
+                return
+            self._devices = [(idx, dev['name'])
+                             for idx, dev in enumerate(sd.query_devices())
+                             if dev['max_output_channels'] > 0]
+        finally:
+            self.ready.set()
+
+    def devices(self, timeout=None):
+        """Return cached ``(index, name)`` pairs, waiting up to ``timeout``."""
+        self.ready.wait(timeout)
+        return list(self._devices)
+
+
+def _generator_worker(ring_name, capacity, channels, sample_rate, block_size,
+                      seed, commands, awake):
+    """Child process body: render blocks into the shared ring until 'quit'."""
+    ring = SharedRing(capacity, channels, name=ring_name)
+    # The renderer never opens a device; only its generators and the
+    # crossfading _render are used.
+    renderer = BrownNoisePlayer(sample_rate, block_size, channels=channels,
+                                seed=seed, idle_timeout=None,
+                                backend=NullBackend(realtime=False))
+    renderer.start()
+    block = np.zeros((block_size, channels), dtype=np.float32)
+    interval = block_size / sample_rate / 2
+    try:
+        while True:
+            ring.beat()
+            try:
+                while True:
+                    command, value = commands.get_nowait()
+                    if command == 'quit':
+                        return
+                    if command == 'wave':
+                        renderer.set_wave_type(value)
+                    elif command == 'tones':
+                        renderer.set_tones(value)
+                    elif command == 'spectrum':
+                        renderer.set_spectrum(*value)
+            except Empty:
+                pass
+            if not awake.is_set():
+                # Suspended; close() also sets the event to deliver 'quit'.
+                awake.wait()
+            elif ring.writable() >= block_size:
+                renderer._render(block)
+                ring.write(block)
+            else:
+                time.sleep(interval)
+    finally:
+        renderer.close()
+        ring.close()
+
+
+class GeneratorProcess:
+    """Runs the generators in a child process that fills a SharedRing.
+
+    Commands go to the child over a ``multiprocessing`` queue, so nothing
+    here is called from the audio callback. A watchdog thread restarts the
+    child when its heartbeat stops for ``STALL_TIMEOUT`` seconds while it
+    should be rendering, or when it dies.
+    """
+
+    STALL_TIMEOUT = 1.0
+    # Allowance for a fresh child to import numpy and send its first beat.
+    STARTUP_TIMEOUT = 10.0
+
+    def __init__(self, ring, sample_rate, block_size, channels=1, seed=None,
+                 wave_type='Brown'):
+        # spawn rather than fork: the parent has audio and UI threads.
+        self.context = multiprocessing.get_context('spawn')
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.channels = channels
+        self.seed = seed
+        # The latest value of each command, replayed to a restarted child.
+        self.settings = {'wave': wave_type}
+        self.awake = self.context.Event()
+        self.restarts = 0
+        self._closed = threading.Event()
+        self._launch()
+        self._watchdog = threading.Thread(target=self._watch, daemon=True)
+        self._watchdog.start()
+
+    def _launch(self):
+        self.commands = self.context.Queue()
+        self.process = self.context.Process(
+            target=_generator_worker, daemon=True,
+            args=(self.ring.name, self.ring.capacity, self.channels,
+                  self.sample_rate, self.block_size, self.seed,
+                  self.commands, self.awake))
+        self.process.start()
+        self._launched_at = time.monotonic()
+        # The wave goes last: 'Custom' needs its spectrum first.
+        for command in ('tones', 'spectrum', 'wave'):
+            if command in self.settings:
+                self.commands.put((command, self.settings[command]))
+
+    def push(self, command, value=None):
+        """ControlQueue-compatible: forward a command to the child."""
+        if command != 'quit':
+            self.settings[command] = value
+        try:
+            self.commands.put_nowait((command, value))
+        except Full:
+            return False
+        return True
+
+    def _watch(self):
+        beat, changed = self.ring.heartbeat, None
+        while not self._closed.is_set():
+            if not self.awake.is_set():
+                # The child does not beat while suspended; close() sets the
+                # event as well.
+                self.awake.wait()
+                beat, changed = self.ring.heartbeat, None
+                continue
+            self._closed.wait(self.STALL_TIMEOUT / 4)
+            now = time.monotonic()
+            if self.ring.heartbeat != beat:
+                beat, changed = self.ring.heartbeat, now
+                continue
+            if changed is None:
+                changed = max(now, self._launched_at + self.STARTUP_TIMEOUT
+                              - self.STALL_TIMEOUT)
+            if not self.process.is_alive() or now - changed > self.STALL_TIMEOUT:
+                self.restart()
+                beat, changed = self.ring.heartbeat, None
+
+    def restart(self):
+        """Kill the child and start a new one on the same ring."""
+        self.process.kill()
+        self.process.join()
+        self.restarts += 1
+        self._launch()
+
+    def close(self, timeout=1.0):
+        self._closed.set()
+        self.push('quit')
+        self.awake.set()
+        self._watchdog.join()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
 class BrownNoisePlayer:
-    def __init__(self, sample_rate=44100, block_size=1024, device=None):
+    # How long set_device waits for the new stream to start calling back.
+    SWITCH_TIMEOUT = 1.0
+    # With auto_tune, this many underruns within RETUNE_INTERVAL seconds
+    # move the stream to the next larger block size.
+    RETUNE_UNDERRUNS = 3
+    RETUNE_INTERVAL = 5.0
+
+    def __init__(self, sample_rate=44100, block_size=1024, device=None,
+                 lookahead=0, seed=None, loop_cache=None, channels=1,
+                 mirrors=(), idle_timeout=10.0, backend=None, latency=None,
+                 auto_tune=False, process=False):
+        # auto_tune measures every wave type and replaces block_size and
+        # latency with the smallest safe values; see autotune().
+        self.auto_tune = auto_tune
+        self.tuning = None
+        if auto_tune:
+            self.tuning = autotune(sample_rate, channels)
+            block_size, latency = self.tuning['block_size'], self.tuning['latency']
         self.sample_rate = sample_rate
         self.block_size = block_size
+        self.latency = latency
         self.device = device
-        self.gain = 0.01
+        self.channels = channels
+        # Anything with an sd.OutputStream-compatible factory, e.g. NullBackend.
+        if backend is None and sd is None:
+            raise RuntimeError(
+                f"no audio backend: sounddevice failed to load ({_sd_error}); "
+                "install PortAudio or pass backend=NullBackend()"
+            ) from _sd_error
+        self.backend = backend if backend is not None else sd
+        # Extra devices that play the same rendered audio as ``device``.
+        self.mirrors = list(mirrors)
+        # With lookahead > 0 a producer thread renders that many blocks ahead
+        # and the callbacks only copy from the ring. Mirrored outputs read the
+        # same ring, so audio is rendered once for every device.
+        # With ``process`` the generators run in a child process that fills a
+        # SharedRing instead, so the GIL and garbage collection in this
+        # process cannot delay rendering; see GeneratorProcess.
+        if process and self.mirrors:
+            raise ValueError("process mode does not support mirrors")
+        if (self.mirrors or process) and not lookahead:
+            lookahead = 4
+        self.lookahead = lookahead
+        self.ring = None
+        self.worker = None
+        if process:
+            self.ring = SharedRing(lookahead * block_size, channels)
+        elif lookahead:
+            self.ring = RingBuffer(lookahead * block_size, channels,
+                                   readers=1 + len(self.mirrors))
+        # Parameter changes reach the audio side only through these queues:
+        # gain and start/stop go to the callback, wave changes to whichever
+        # thread renders (the producer in ring mode, the child in process
+        # mode).
+        self.controls = ControlQueue()
+        self.render_controls = ControlQueue() if self.ring else self.controls
+        self._gain = 0.01
         self.running = False
-        self.prev_sample = 0
+        self.rng = np.random.default_rng(seed)
+        self.generators = {name: cls(self.rng, sample_rate, block_size, channels)
+                           for name, cls in GENERATORS.items()}
         self.wave_type = 'Brown'
-        self.phase = 0
-        self._stop_event = threading.Event()
-        self._start_stream()
+        # With a LoopCache, playback copies from memory-mapped loop tables
+        # instead of generating audio live.
+        self.loop_cache = loop_cache
+        self.tables = {}
+        self._load_table(self.wave_type)
+        self.underflows = 0
+        self.underflow_frames = 0
+        self.telemetry = Telemetry()
+        self._block = np.zeros((block_size, channels), dtype=np.float32)
+        # Audio-side state, only touched while draining the queues.
+        # _sources is what the render side plays for each wave; set_tones,
+        # set_spectrum and new loop tables replace entries with 'source'
+        # commands, so a change is crossfaded rather than swapped mid-block.
+        self._sources = {name: self._playback(name) for name in self.generators}
+        self._active_wave = self.wave_type
+        self._xfade_from = None
+        self._playing = False
+        self._gain_target = self._gain
+        self._gain_current = 0.0
+        self._allocate_ramps(block_size)
+        self._allocate_xfade(block_size)
+        # Each main stream gets a generation number; see set_device.
+        self._generation = 0
+        self._retired = -1
+        self._warm = threading.Event()
+        # Streams are opened here but only run between start() and the idle
+        # suspend that follows stop() after ``idle_timeout`` seconds (never
+        # if it is None).
+        self.idle_timeout = idle_timeout
+        self.suspended = True
+        self.resume_latency = None
+        self._resumed_at = None
+        self._idle_timer = None
+        self._retune_timer = None
+        self._underruns_seen = 0
+        self._lifecycle = threading.Lock()
+        # Held for a whole device switch, so switches apply in order.
+        self._switching = threading.Lock()
+        self._awake = threading.Event()
+        self._closed = threading.Event()
+        if process:
+            self.worker = GeneratorProcess(self.ring, sample_rate, block_size,
+                                           channels, seed, self.wave_type)
+            self.render_controls = self.worker
+        self._open_streams()
+
+    @property
+    def prev_sample(self):
+        return self.generators['Brown'].filter.state
+
+    @property
+    def gain(self):
+        return self._gain
+
+    @gain.setter
+    def gain(self, value):
+        self._gain = value
+        self._post(self.controls, 'gain', value)
+
+    def _load_table(self, wave_type):
+        if (self.loop_cache is not None and wave_type in GENERATORS
+                and wave_type not in self.tables):
+            table = self.loop_cache.table(wave_type, self.sample_rate,
+                                          generator=self.generators[wave_type])
+            self.tables[wave_type] = LoopTable(table)
+
+    def _playback(self, wave_type):
+        table = self.tables.get(wave_type)
+        return table if table is not None else self.generators[wave_type]
+
+    def _source(self):
+        return self._sources[self._active_wave]
+
+    def _unit_ramp(self, frames):
+        # One column per channel, like BrownFilter's weights.
+        k = np.arange(1, frames + 1, dtype=np.float32)[:, None] / frames
+        return np.repeat(k, self.channels, axis=1)
+
+    def _allocate_ramps(self, frames):
+        # Gain ramps and the hand-over fade, sized to the callback's blocks.
+        k = self._unit_ramp(frames)
+        self._ramp = k
+        self._gain_buf = np.empty_like(k)
+        self._fade_out = np.cos(k * (np.pi / 2))
+
+    def _allocate_xfade(self, frames):
+        # Wave crossfades, sized to the blocks _render fills: the callback's
+        # without a ring, the producer's _block with one. A retune changes
+        # only the former, so the two sets of ramps are kept apart.
+        k = self._unit_ramp(frames)
+        self._xfade_in = np.sin(k * (np.pi / 2))
+        self._xfade_out = np.cos(k * (np.pi / 2))
+        self._xfade_buf = np.empty_like(k)
+
+    def _drain(self, queue):
+        while True:
+            item = queue.pop()
+            if item is None:
+                break
+            self._apply(*item)
+        if queue.overflowed:
+            # Commands were dropped while the queue was full; catch up with
+            # the latest state instead of replaying them.
+            queue.overflowed = False
+            if queue is self.controls:
+                self._apply('gain', self._gain)
+                self._apply('start' if self.running else 'stop')
+            if queue is self.render_controls:
+                for name in list(self.generators):
+                    self._apply('source', (name, self._playback(name)))
+                self._apply('wave', self.wave_type)
+
+    def _apply(self, command, value=None):
+        if command == 'gain':
+            self._gain_target = value
+        elif command == 'start':
+            self._playing = True
+        elif command == 'stop':
+            self._playing = False
+        elif command == 'wave' and value != self._active_wave:
+            if self._xfade_from is None:
+                self._xfade_from = self._source()
+            self._active_wave = value
+            self._source().reset()
+        elif command == 'source':
+            name, source = value
+            if source is not self._sources.get(name):
+                if name == self._active_wave and self._xfade_from is None:
+                    self._xfade_from = self._source()
+                self._sources[name] = source
 
-    def _create_stream(self):
-        return sd.OutputStream(
+    def _render(self, out):
+        """Render the active wave, crossfading over one block after a switch."""
+        self._drain(self.render_controls)
+        self._source().render(out)
+        previous = self._xfade_from
+        if previous is not None:
+            self._xfade_from = None
+            if len(self._xfade_buf) != len(out):
+                self._allocate_xfade(len(out))
+            old = self._xfade_buf
+            previous.render(old)
+            old *= self._xfade_out
+            out *= self._xfade_in
+            out += old
+
+    def _create_stream(self, device=None, callback=None):
+        return self.backend.OutputStream(
             samplerate=self.sample_rate,
             blocksize=self.block_size,
-            channels=1,
+            channels=self.channels,
             dtype='float32',
-            device=self.device,
-            callback=self.audio_callback
+            device=self.device if device is None else device,
+            callback=callback or self.audio_callback,
+            latency=self.latency
         )
 
-    def _start_stream(self):
-        self.stream = self._create_stream()
-        self._thread = threading.Thread(target=self._run_stream, daemon=True)
-        self._thread.start()
+    def _mirror_callback(self, reader):
+        def callback(outdata, frames, time, status):
+            self._fill(outdata, frames, status, reader)
+        return callback
 
-    def _stop_stream(self):
-        self._stop_event.set()
-        if hasattr(self, '_thread') and self._thread.is_alive():
-            self._thread.join()
-        if hasattr(self, 'stream'):
-            self.stream.close()
-        self._stop_event.clear()
+    def _stream_callback(self, generation):
+        def callback(outdata, frames, time, status):
+            if generation == self._generation and self._retired >= generation - 1:
+                self._fill(outdata, frames, status)
+            elif generation == self._generation - 1 and self._retired < generation:
+                # Last block on the old device: fade out and hand over.
+                self._fill(outdata, frames, status, fade_out=True)
+                self._retired = generation
+            else:
+                # Warming up, or waiting for the old stream to hand over.
+                outdata.fill(0)
+                if generation > self._generation:
+                    self._warm.set()
+        return callback
+
+    def _open_streams(self):
+        self.stream = self._create_stream(
+            callback=self._stream_callback(self._generation))
+        self.mirror_streams = [
+            self._create_stream(device, self._mirror_callback(i + 1))
+            for i, device in enumerate(self.mirrors)
+        ]
+        if self.ring is not None and self.worker is None:
+            self._producer = threading.Thread(target=self._produce, daemon=True)
+            self._producer.start()
+
+    def _resume(self):
+        # Called with _lifecycle held.
+        if not self.suspended:
+            return
+        # Nothing drained the queues while suspended; send the latest state.
+        self.controls.push('gain', self._gain)
+        if self.worker is None:
+            for name in self.generators:
+                self.render_controls.push('source', (name, self._playback(name)))
+        self.render_controls.push('wave', self.wave_type)
+        self.suspended = False
+        self._awake.set()
+        if self.worker is not None:
+            self.worker.awake.set()
+        self._resumed_at = time.perf_counter()
+        self.stream.start()
+        for stream in self.mirror_streams:
+            stream.start()
+
+    def _suspend(self):
+        with self._lifecycle:
+            if self.running or self.suspended or self._closed.is_set():
+                return
+            self.suspended = True
+            self._awake.clear()
+            if self.worker is not None:
+                self.worker.awake.clear()
+            self.stream.stop()
+            for stream in self.mirror_streams:
+                stream.stop()
+
+    def _schedule_suspend(self):
+        # Only the latest stop counts; an older timer would suspend early.
+        self._cancel_suspend()
+        if self.idle_timeout is None:
+            return
+        # Leave time for the fade-out block to reach the device.
+        delay = max(self.idle_timeout, 4 * self.block_size / self.sample_rate)
+        self._idle_timer = threading.Timer(delay, self._suspend)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _cancel_suspend(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _post(self, queue, command, value=None):
+        with self._lifecycle:
+            # While suspended the state is picked up by _resume instead.
+            if not self.suspended:
+                queue.push(command, value)
 
-    def _run_stream(self):
-        with self.stream:
-            while not self._stop_event.is_set():
-                sd.sleep(100)
+    def _produce(self):
+        # Poll at half a block so the ring is topped up well before it drains.
+        interval = self.block_size / self.sample_rate / 2
+        while not self._closed.is_set():
+            if not self._awake.is_set():
+                self._awake.wait()
+            elif self.ring.writable() >= self.block_size:
+                self._render(self._block)
+                self.ring.write(self._block)
+            else:
+                # A stopped player leaves the ring full; keep taking
+                # commands so the queue does not fill up behind it.
+                self._drain(self.render_controls)
+                self._closed.wait(interval)
 
     def audio_callback(self, outdata, frames, time, status):
+        self._fill(outdata, frames, status)
+
+    def _fill(self, outdata, frames, status, reader=0, fade_out=False):
+        started = time.perf_counter()
         if status:
-            print(status)
-        if self.running:
-            if self.wave_type == 'Brown':
-                white = np.random.normal(0, 1, frames)
-                data = np.empty(frames)
-                for i, w in enumerate(white):
-                    self.prev_sample = (self.prev_sample + 0.02 * w) / 1.02
-                    data[i] = self.prev_sample * 3.5
-            elif self.wave_type == 'White':
-                data = np.random.normal(0, 0.1, frames)
-            else:  # Sine
-                t = (np.arange(frames) + self.phase) / self.sample_rate
-                freq = 440
-                data = np.sin(2 * np.pi * freq * t)
-                self.phase += frames
-            data = np.clip(data * self.gain, -1, 1)
-            outdata[:, 0] = data.astype(np.float32)
-        else:
+            self.telemetry.record_status(status)
+        self._fill_block(outdata, frames, reader, fade_out)
+        self.telemetry.record(time.perf_counter() - started,
+                              frames / self.sample_rate)
+
+    def _fill_block(self, outdata, frames, reader, fade_out):
+        if reader == 0:
+            if self._resumed_at is not None:
+                self.resume_latency = time.perf_counter() - self._resumed_at
+                self._resumed_at = None
+            self._drain(self.controls)
+            if len(self._ramp) != frames:
+                self._allocate_ramps(frames)
+        start = self._gain_current
+        end = self._gain_target if self._playing else 0.0
+        if start == 0.0 and end == 0.0:
             outdata.fill(0)
+            return
+        # Everything below writes straight into outdata; nothing is
+        # allocated per block once the buffers are warmed up.
+        data = outdata
+        if self.ring is None:
+            self._render(data)
+        else:
+            got = self.ring.read_into(data, reader)
+            if got < frames:
+                self.underflows += 1
+                self.underflow_frames += frames - got
+                data[got:] = 0
+        if reader != 0 or start == end:
+            np.multiply(data, end, out=data)
+        else:
+            # Ramp gain changes, start and stop across the block.
+            ramp = self._gain_buf
+            np.multiply(self._ramp, end - start, out=ramp)
+            ramp += start
+            data *= ramp
+            self._gain_current = end
+        if fade_out:
+            # The next stream starts again from silence.
+            data *= self._fade_out
+            self._gain_current = 0.0
+        np.clip(data, -1, 1, out=data)
 
     def start(self):
-        self.running = True
+        """Start playback, resuming the stream first if it was suspended.
+
+        ``resume_latency`` is updated with the time from here to the first
+        callback.
+        """
+        with self._lifecycle:
+            self._cancel_suspend()
+            self.running = True
+            self.controls.push('start')
+            self._resume()
+            if self.auto_tune and self._retune_timer is None:
+                self._schedule_retune_check()
 
     def stop(self):
-        self.running = False
+        with self._lifecycle:
+            self.running = False
+            if not self.suspended:
+                self.controls.push('stop')
+                self._schedule_suspend()
 
     def close(self):
-        self._stop_stream()
+        with self._lifecycle:
+            self._cancel_suspend()
+            if self._retune_timer is not None:
+                self._retune_timer.cancel()
+            self._closed.set()
+            self._awake.set()
+        if hasattr(self, '_producer') and self._producer.is_alive():
+            self._producer.join()
+        self.stream.close()
+        for stream in self.mirror_streams:
+            stream.close()
+        if self.worker is not None:
+            self.worker.close()
+            self.ring.close()
+
+    def _post_source(self, wave_type):
+        # In process mode the child builds and swaps its own sources.
+        if self.worker is None:
+            self._post(self.render_controls, 'source',
+                       (wave_type, self._playback(wave_type)))
 
     def set_wave_type(self, wave_type):
+        self._load_table(wave_type)
         self.wave_type = wave_type
-        self.prev_sample = 0
-        self.phase = 0
+        self._post_source(wave_type)
+        self._post(self.render_controls, 'wave', wave_type)
 
-    def set_device(self, device):
-        """Switch to a different output device."""
-        self._stop_stream()
-        self.device = device
-        self._start_stream()
+    def set_spectrum(self, tilt=0.0, shape=None):
+        """Play noise with a custom spectrum as the ``'Custom'`` wave type.
+
+        ``tilt`` is in dB per octave; ``shape`` maps frequencies in Hz to a
+        linear magnitude and takes precedence over ``tilt``.
+        """
+        self.generators['Custom'] = SpectralNoiseGenerator(
+            self.rng, self.sample_rate, self.block_size, self.channels,
+            tilt=tilt, shape=shape)
+        if self.worker is not None:
+            # In process mode ``shape`` must be picklable, e.g. a module-level
+            # function rather than a lambda.
+            self.worker.push('spectrum', (tilt, shape))
+        self.set_wave_type('Custom')
+
+    def set_tones(self, voices):
+        """Play ``(frequency, amplitude)`` pairs together as the Sine wave."""
+        # A new bank rather than set_voices() on the one that is playing, so
+        # the render side can crossfade from the old voices.
+        self.generators['Sine'] = SineGenerator(
+            self.rng, self.sample_rate, self.block_size, self.channels,
+            voices=voices)
+        if self.worker is not None:
+            self.worker.push('tones', voices)
+        # The cached Sine table was rendered with the old voices.
+        if self.tables.pop('Sine', None) is not None:
+            self._load_table('Sine')
+        self._post_source('Sine')
+
+    def set_device(self, device, wait=False):
+        """Switch to a different output device with almost no gap.
+
+        The new stream is opened and started first and plays silence until
+        the old stream has faded out its last block; it then takes over with
+        a fade-in. The old stream is closed in the background.
+
+        The switch runs on a worker thread, so the caller (usually the UI)
+        never waits for the device; the thread is returned for callers that
+        want to join it. With ``wait`` it runs in the calling thread instead,
+        so an invalid device raises here rather than on the worker.
+        """
+        if wait:
+            self._switch_stream(device)
+            return None
+        thread = threading.Thread(target=self._switch_stream, args=(device,),
+                                  daemon=True)
+        thread.start()
+        return thread
+
+    def _switch_stream(self, device, block_size=None, latency=None):
+        with self._switching:
+            with self._lifecycle:
+                if self._closed.is_set():
+                    return
+                if block_size is not None:
+                    self.block_size = block_size
+                    self.latency = latency
+                generation = self._generation + 1
+                stream = self._create_stream(device,
+                                             self._stream_callback(generation))
+                self._warm.clear()
+                started = not self.suspended
+                if started:
+                    stream.start()
+            # start(), stop() and the idle suspend keep working while the
+            # new device warms up; whatever they changed is checked below.
+            if started:
+                self._warm.wait(self.SWITCH_TIMEOUT)
+            with self._lifecycle:
+                if self._closed.is_set():
+                    stream.close()
+                    return
+                old = self.stream
+                self.device = device
+                self.stream = stream
+                self._generation = generation
+                if self.suspended:
+                    # Nothing is playing, so just swap the streams.
+                    self._retired = generation - 1
+                    stream.stop()
+                    old.close()
+                    return
+                if not started:
+                    # Resumed while the new stream was being opened.
+                    stream.start()
+        threading.Thread(target=self._retire, args=(old, generation - 1),
+                         daemon=True).start()
+
+    def _retire(self, stream, generation):
+        deadline = time.monotonic() + self.SWITCH_TIMEOUT
+        while self._retired < generation and time.monotonic() < deadline:
+            time.sleep(self.block_size / self.sample_rate)
+        # An old device that stopped calling back must not block the new one.
+        self._retired = max(self._retired, generation)
+        stream.close()
+
+    def _schedule_retune_check(self):
+        self._retune_timer = threading.Timer(self.RETUNE_INTERVAL,
+                                             self._check_underruns)
+        self._retune_timer.daemon = True
+        self._retune_timer.start()
+
+    def _check_underruns(self):
+        self._retune_timer = None
+        if self._closed.is_set() or not self.running:
+            return
+        underruns = self.telemetry.underflows + self.underflows
+        recent = underruns - self._underruns_seen
+        self._underruns_seen = underruns
+        if recent >= self.RETUNE_UNDERRUNS:
+            self.retune()
+        self._schedule_retune_check()
+
+    def retune(self):
+        """Move the stream to the next larger block size, if there is one.
+
+        Returns the new block size, or None if the player is already at the
+        largest size it can use.
+        """
+        # Ring readers may take at most the ring minus one producer block.
+        limit = self.ring.capacity // 2 if self.ring is not None else None
+        larger = [b for b in BLOCK_CANDIDATES if b > self.block_size
+                  and (limit is None or b <= limit)]
+        if not larger:
+            return None
+        block_size = larger[0]
+        self._switch_stream(self.device, block_size,
+                            LATENCY_BLOCKS * block_size / self.sample_rate)
+        return block_size
+
+
+BLOCK_CANDIDATES = (64, 128, 256, 512, 1024, 2048, 4096)
+# Requested stream latency, in blocks, for an auto-tuned block size.
+LATENCY_BLOCKS = 2
+
+
+def measure_callback(player, blocks=200, warmup=20):
+    """Call ``player.audio_callback`` directly and return per-block seconds.
+
+    The player should be on a non-realtime NullBackend and already started.
+    """
+    block_size = player.block_size
+    outdata = np.zeros((block_size, player.channels), dtype=np.float32)
+    for _ in range(warmup):
+        player.audio_callback(outdata, block_size, None, None)
+    times = np.empty(blocks)
+    for i in range(blocks):
+        started = time.perf_counter()
+        player.audio_callback(outdata, block_size, None, None)
+        times[i] = time.perf_counter() - started
+    return times
+
+
+def autotune(sample_rate=44100, channels=1, waves=None, margin=0.5,
+             candidates=BLOCK_CANDIDATES, blocks=200):
+    """Find the smallest block size that keeps the callback within ``margin``.
+
+    Every wave type is timed at each candidate size, smallest first, and the
+    first size whose worst 99th-percentile cost is at most ``margin`` of the
+    block deadline wins. Returns a dict with ``block_size``, the requested
+    stream ``latency`` in seconds and the measured ``loads`` per wave type.
+    """
+    waves = list(waves or GENERATORS)
+    loads = {}
+    for block_size in candidates:
+        deadline = block_size / sample_rate
+        loads = {}
+        for wave_type in waves:
+            player = BrownNoisePlayer(sample_rate=sample_rate,
+                                      block_size=block_size, channels=channels,
+                                      seed=0, idle_timeout=None,
+                                      backend=NullBackend(realtime=False))
+            try:
+                player.set_wave_type(wave_type)
+                player.start()
+                times = measure_callback(player, blocks)
+            finally:
+                player.close()
+            loads[wave_type] = float(np.percentile(times, 99) / deadline)
+        if max(loads.values()) <= margin:
+            break
+    return {
+        'block_size': block_size,
+        'latency': LATENCY_BLOCKS * block_size / sample_rate,
+        'loads': loads,
+    }
 
 class BrownNoiseUI:
     def __init__(self):
+        # Tk is imported by the UI methods only, so headless use (render, the
+        # daemon) never loads it.
+        import tkinter as tk
+        # Start enumerating devices before Tk comes up; the menu is filled in
+        # once the query finishes.
+        self.device_cache = DeviceCache()
         self.player = BrownNoisePlayer()
         self.root = tk.Tk()
         self.root.title("Noise Generator")
         self.create_widgets()
 
-    def _get_output_devices(self):
-        devices = []
-        for idx, dev in enumerate(sd.query_devices()):
-            if dev['max_output_channels'] > 0:
-                devices.append((idx, dev['name']))
-        return devices
-
     def create_widgets(self):
+        import tkinter as tk
+        from tkinter import ttk
         frame = ttk.Frame(self.root, padding=10)
         frame.pack(fill=tk.BOTH, expand=True)
 
-        devices = self._get_output_devices()
-        self.device_map = {name: idx for idx, name in devices}
-        self.device_var = tk.StringVar()
-        default_index = sd.default.device[1]
-        default_name = next((name for name, idx in self.device_map.items()
-                             if idx == default_index), None)
-        if default_name is None and devices:
-            default_name = devices[0][1]
-        self.device_var.set(default_name)
-        device_menu = ttk.OptionMenu(frame, self.device_var, default_name,
-                                     *[name for _, name in devices],
-                                     command=self.update_device)
-        device_menu.pack(fill=tk.X, pady=5)
+        self.device_map = {}
+        self.device_var = tk.StringVar(value="Default")
+        self.device_menu = ttk.OptionMenu(frame, self.device_var, "Default",
+                                          command=self.update_device)
+        self.device_menu.pack(fill=tk.X, pady=5)
         ttk.Label(frame, text="Output Device").pack()
+        ttk.Button(frame, text="Refresh Devices",
+                   command=self.refresh_devices).pack(pady=(0, 5))
+        self.root.after(50, self._poll_devices)
 
         self.volume_var = tk.DoubleVar(value=0.01)
         volume_scale = ttk.Scale(frame, from_=0, to=0.02, orient='horizontal',
@@ -127,7 +1765,7 @@ class BrownNoiseUI:
         ttk.Label(frame, text="Volume").pack()
 
         self.wave_var = tk.StringVar(value='Brown')
-        wave_menu = ttk.OptionMenu(frame, self.wave_var, 'Brown', 'Brown', 'White', 'Sine', command=self.update_wave)
+        wave_menu = ttk.OptionMenu(frame, self.wave_var, 'Brown', *GENERATORS, command=self.update_wave)
         wave_menu.pack(fill=tk.X, pady=5)
         ttk.Label(frame, text="Wave Type").pack()
 
@@ -136,18 +1774,49 @@ class BrownNoiseUI:
         self.stop_button = ttk.Button(frame, text="Stop", command=self.stop)
         self.stop_button.pack(side=tk.LEFT, padx=5)
 
+        self.stats_var = tk.StringVar()
+        ttk.Label(frame, textvariable=self.stats_var).pack(side=tk.LEFT, padx=5)
+        self.root.after(1000, self.update_stats)
+
     def update_volume(self, event=None):
         self.player.gain = self.volume_var.get()
 
     def update_wave(self, value=None):
         self.player.set_wave_type(self.wave_var.get())
 
+    def _poll_devices(self):
+        if not self.device_cache.ready.is_set():
+            self.root.after(50, self._poll_devices)
+            return
+        devices = self.device_cache.devices()
+        self.device_map = {name: idx for idx, name in devices}
+        current = self.device_var.get()
+        if current not in self.device_map:
+            default_index = sd.default.device[1]
+            current = next((name for idx, name in devices
+                            if idx == default_index), None)
+            if current is None:
+                current = devices[0][1] if devices else "Default"
+        self.device_menu.set_menu(current, *self.device_map)
+
+    def refresh_devices(self):
+        self.device_cache.refresh()
+        self.root.after(50, self._poll_devices)
+
     def update_device(self, value=None):
         name = self.device_var.get()
         device = self.device_map.get(name)
         if device is not None:
             self.player.set_device(device)
 
+    def update_stats(self):
+        snap = self.player.telemetry.snapshot()
+        xruns = snap['underflows'] + self.player.underflows
+        self.stats_var.set(f"Underruns: {xruns}  "
+                           f"Load: {snap['mean_load']:.0%} avg, "
+                           f"{snap['max_load']:.0%} max")
+        self.root.after(1000, self.update_stats)
+
     def start(self):
         self.player.start()
 
@@ -160,5 +1829,43 @@ class BrownNoiseUI:
         finally:
             self.player.close()
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Noise generator")
+    sub = parser.add_subparsers(dest='command')
+    rend = sub.add_parser('render', help="render noise to a file")
+    rend.add_argument('output', help="output .wav or raw float32 .pcm file")
+    rend.add_argument('--wave', default='Brown', choices=list(GENERATORS))
+    rend.add_argument('--duration', type=float, default=60.0,
+                      help="length in seconds")
+    rend.add_argument('--sample-rate', type=int, default=44100)
+    rend.add_argument('--gain', type=float, default=1.0)
+    rend.add_argument('--format', choices=['wav', 'raw'])
+    rend.add_argument('--channels', type=int, default=1)
+    rend.add_argument('--chunk-size', type=int)
+    rend.add_argument('--seed', type=int)
+    rend.add_argument('--workers', type=int,
+                      help="render brown noise on this many processes")
+    args = parser.parse_args(argv)
+
+    if args.command == 'render':
+        if args.workers is not None:
+            if args.wave != 'Brown':
+                parser.error("--workers is only supported for Brown")
+            rate = render_brown(args.output, args.duration, args.sample_rate,
+                                args.gain, args.format,
+                                args.chunk_size or 1 << 20, args.seed,
+                                args.channels, args.workers)
+        else:
+            rate = render(args.output, args.wave, args.duration,
+                          args.sample_rate, args.gain, args.format,
+                          args.chunk_size, args.seed, args.channels)
+        size = os.path.getsize(args.output)
+        realtime = rate / (args.sample_rate * args.channels)
+        print(f"Wrote {args.output} ({size} bytes): {rate:,.0f} samples/s, "
+              f"{realtime:,.0f}x real time")
+    else:
+        BrownNoiseUI().run()
+
+
 if __name__ == "__main__":
-    BrownNoiseUI().run()
+    main()
@@ -2,19 +2,38 @@
 """PyQt6 Pomodoro timer with animated ring and schedule list."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional
+import time
+
+# Taken before the Qt imports so --profile-startup can report them.
+_IMPORT_STARTED = time.perf_counter()
+
+import argparse
+import math
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from array import array
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
 
 try:
     from PyQt6.QtCore import (
+        QElapsedTimer,
+        QEvent,
+        QObject,
         QSize,
+        QStandardPaths,
         QUrl,
         QEasingCurve,
         QPointF,
+        QRectF,
         QPropertyAnimation,
         Qt,
         QTimer,
         pyqtProperty,
+        pyqtSignal,
     )
     from PyQt6.QtGui import (
         QAction,
@@ -25,14 +44,16 @@ try:
         QPainter,
         QPalette,
         QPen,
-
+        QPixmap,
     )
-    from PyQt6.QtMultimedia import QSoundEffect
+    # QtMultimedia is imported on first use; see PomodoroApp.sound.
     from PyQt6.QtWidgets import (
         QApplication,
         QCheckBox,
         QGraphicsDropShadowEffect,
         QGraphicsColorizeEffect,
+        QGraphicsPixmapItem,
+        QGraphicsScene,
         QListView,
         QMainWindow,
         QPushButton,
@@ -58,17 +79,42 @@ import resources.resources
 
 
 class RingWidget(QWidget):
-    """Circular progress ring with gradient and animated value."""
-
-    def __init__(self, parent: Optional[QWidget] = None) -> None:
+    """Circular progress ring with gradient and animated value.
+
+    The static track ring is drawn once into a pixmap at the device pixel
+    ratio and reused until the widget is resized, so a frame only draws the
+    arc. The arc moves in whole degrees, and values that would not move it do
+    not repaint at all. ``max_fps`` caps the repaint rate while animating and
+    ``low_power`` jumps straight to each new value without animating. With
+    ``shadow`` the track pixmap also carries a blurred drop shadow, so it
+    costs nothing per frame.
+    """
+
+    MARGIN = 10
+    PEN_WIDTH = 12
+
+    def __init__(self, parent: Optional[QWidget] = None,
+                 max_fps: Optional[int] = None, low_power: bool = False) -> None:
         super().__init__(parent)
         self._value = 0.0
+        self.max_fps = max_fps
+        self.low_power = low_power
         self._anim = QPropertyAnimation(self, b"value", self)
         self._anim.setEasingCurve(QEasingCurve.Type.InOutCubic)
         self._anim.setDuration(1000)
+        # A capped frame rate may skip intermediate frames, never the last.
+        self._anim.finished.connect(self.update)
         self._gradient = QConicalGradient(QPointF(0, 0), 0)
         self._gradient.setColorAt(0.0, QColor("#00d2ff"))
         self._gradient.setColorAt(1.0, QColor("#3a7bd5"))
+        self._track_pen = QPen(QColor("#333"))
+        self._track_pen.setWidth(self.PEN_WIDTH)
+        self._arc_pen = QPen(self._gradient, self.PEN_WIDTH)
+        self._track: Optional[QPixmap] = None
+        self._span: Optional[int] = None
+        self.shadow = False
+        self._painted = QElapsedTimer()
+        self._painted.start()
         self._display = QLabel("00:00", self)
         font = QFont("Rubik", 48, QFont.Weight.Bold)
         self._display.setFont(font)
@@ -81,20 +127,68 @@ class RingWidget(QWidget):
     def sizeHint(self) -> QSize:
         return QSize(250, 250)
 
+    def _ring_rect(self):
+        m = self.MARGIN
+        return self.rect().adjusted(m, m, -m, -m)
+
+    @staticmethod
+    def _span_for(value: float) -> int:
+        """Arc span in Qt's 1/16 degree units, rounded to whole degrees."""
+        return int(-360 * value) * 16
+
+    def _render_track(self, ratio: float) -> QPixmap:
+        pixmap = QPixmap(self.size() * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(self._track_pen)
+        painter.drawEllipse(self._ring_rect())
+        painter.end()
+        if self.shadow:
+            pixmap = self._add_shadow(pixmap)
+        return pixmap
+
+    @staticmethod
+    def _add_shadow(pixmap: QPixmap) -> QPixmap:
+        # Let a drop shadow effect blur the pixmap once, offscreen.
+        effect = QGraphicsDropShadowEffect()
+        effect.setBlurRadius(12)
+        effect.setColor(QColor(0, 0, 0, 160))
+        effect.setOffset(3, 3)
+        item = QGraphicsPixmapItem(pixmap)
+        item.setGraphicsEffect(effect)
+        scene = QGraphicsScene()
+        scene.addItem(item)
+        out = QPixmap(pixmap.size())
+        out.setDevicePixelRatio(pixmap.devicePixelRatio())
+        out.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(out)
+        rect = QRectF(QPointF(0, 0), pixmap.deviceIndependentSize())
+        scene.render(painter, rect, rect)
+        painter.end()
+        return out
+
+    def set_shadow(self, enabled: bool) -> None:
+        self.shadow = enabled
+        self._track = None
+        self.update()
+
+    def resizeEvent(self, event) -> None:
+        self._track = None
+        super().resizeEvent(event)
+
     def paintEvent(self, event) -> None:  # noqa: D401
         painter = QPainter(self)
+        ratio = self.devicePixelRatioF()
+        if self._track is None or self._track.devicePixelRatio() != ratio:
+            self._track = self._render_track(ratio)
+        painter.drawPixmap(0, 0, self._track)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        rect = self.rect().adjusted(10, 10, -10, -10)
-        pen = QPen()
-        pen.setWidth(12)
-        pen.setColor(QColor("#333"))
-        painter.setPen(pen)
-        painter.drawEllipse(rect)
-        pen.setColor(QColor("#fff"))
-        pen.setBrush(self._gradient)
-        painter.setPen(pen)
-        span = int(-360 * self._value)
-        painter.drawArc(rect, 90 * 16, span * 16)
+        painter.setPen(self._arc_pen)
+        self._span = self._span_for(self._value)
+        painter.drawArc(self._ring_rect(), 90 * 16, self._span)
+        self._painted.restart()
 
     @pyqtProperty(float)
     def value(self) -> float:
@@ -103,10 +197,25 @@ class RingWidget(QWidget):
     @value.setter
     def value(self, val: float) -> None:
         self._value = val
+        if self._span_for(val) == self._span:
+            return
+        if (self.max_fps and self._anim.state() == QPropertyAnimation.State.Running
+                and self._painted.elapsed() < 1000 / self.max_fps):
+            return
         self.update()
 
+    def set_low_power(self, enabled: bool) -> None:
+        self.low_power = enabled
+        if enabled and self._anim.state() == QPropertyAnimation.State.Running:
+            end = self._anim.endValue()
+            self._anim.stop()
+            self.value = end
+
     def set_progress(self, fraction: float) -> None:
         self._anim.stop()
+        if self.low_power:
+            self.value = fraction
+            return
         self._anim.setStartValue(self._value)
         self._anim.setEndValue(fraction)
         self._anim.start()
@@ -115,43 +224,131 @@ class RingWidget(QWidget):
         self._display.setText(text)
 
 
-@dataclass
-class Slot:
-    time: str
-    title: str = ""
-    color: QColor = QColor("#ffffff")
-    completed: bool = False
+SLOTS_PER_DAY = 96
+SLOT_MINUTES = 15
+WHITE = 0xFFFFFFFF
+# Custom role for a slot's completion state.
+CompletedRole = Qt.ItemDataRole.UserRole + 1
+
+
+class SlotStore:
+    """Columnar storage for 15 minute slots starting at ``start``.
+
+    Slot times are derived from the row number, colors are packed ARGB
+    integers and completion flags are bytes, so a multi-week schedule costs a
+    few bytes per slot plus the titles that are actually set.
+    """
+
+    __slots__ = ("start", "days", "titles", "colors", "completed")
+
+    def __init__(self, days: int = 1, start: Optional[datetime] = None) -> None:
+        if start is None:
+            start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.start = start
+        self.days = days
+        count = days * SLOTS_PER_DAY
+        self.titles: List[str] = [""] * count
+        self.colors = array("I", [WHITE]) * count
+        self.completed = bytearray(count)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def when(self, row: int) -> datetime:
+        return self.start + timedelta(minutes=row * SLOT_MINUTES)
+
+    def time_text(self, row: int) -> str:
+        if self.days == 1:
+            minutes = row * SLOT_MINUTES
+            return f"{minutes // 60:02d}:{minutes % 60:02d}"
+        return self.when(row).strftime("%Y-%m-%d %H:%M")
+
+    def row_at(self, when: datetime) -> int:
+        """Row of the slot containing ``when``, clamped to the store."""
+        row = int((when - self.start).total_seconds() // (SLOT_MINUTES * 60))
+        return max(0, min(len(self) - 1, row))
 
 
 class ScheduleModel(QAbstractListModel):
-    """Model for 15 minute schedule slots."""
+    """Model for 15 minute schedule slots.
+
+    Rows are handed to the view ``FETCH_ROWS`` at a time through
+    ``canFetchMore``/``fetchMore``, and role values are cached: display
+    strings per row until the title changes, and one shared QColor per
+    distinct color plus one font and foreground for completed slots.
+    """
+
+    FETCH_ROWS = 2 * SLOTS_PER_DAY
 
-    def __init__(self) -> None:
+    def __init__(self, days: int = 1, start: Optional[datetime] = None) -> None:
         super().__init__()
-        self.slots: List[Slot] = []
-        for h in range(24):
-            for q in range(4):
-                self.slots.append(Slot(f"{h:02d}:{q*15:02d}"))
+        self.store = SlotStore(days, start)
+        self._loaded = min(len(self.store), self.FETCH_ROWS)
+        self._display: List[Optional[str]] = [None] * len(self.store)
+        self._colors: Dict[int, QColor] = {}
+        self._done_font = QFont()
+        self._done_font.setStrikeOut(True)
+        self._done_color = QColor("#eee")
+        self._done_color.setAlphaF(0.3)
 
     def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: D401
-        return len(self.slots)
+        return 0 if parent.isValid() else self._loaded
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:  # noqa: D401
+        return not parent.isValid() and self._loaded < len(self.store)
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:  # noqa: D401
+        if parent.isValid():
+            return
+        count = min(self.FETCH_ROWS, len(self.store) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def load_slots(self, records) -> None:
+        """Set ``(row, title, color, completed)`` records with one dataChanged."""
+        store = self.store
+        rows = []
+        for row, title, color, completed in records:
+            store.titles[row] = title
+            store.colors[row] = color
+            store.completed[row] = completed
+            self._display[row] = None
+            rows.append(row)
+        # Rows the view has not fetched yet are read when they are.
+        visible = [row for row in rows if row < self._loaded]
+        if visible:
+            self.dataChanged.emit(self.index(min(visible)), self.index(max(visible)))
+
+    def color(self, argb: int) -> QColor:
+        color = self._colors.get(argb)
+        if color is None:
+            color = self._colors[argb] = QColor.fromRgba(argb)
+        return color
 
     def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> QVariant:
         if not index.isValid():
             return QVariant()
-        slot = self.slots[index.row()]
+        row = index.row()
+        store = self.store
         if role == Qt.ItemDataRole.DisplayRole:
-            return f"{slot.time} {slot.title}"
+            text = self._display[row]
+            if text is None:
+                text = self._display[row] = f"{store.time_text(row)} {store.titles[row]}"
+            return text
+        if role == Qt.ItemDataRole.EditRole:
+            return store.titles[row]
         if role == Qt.ItemDataRole.BackgroundRole:
-            return slot.color
-        if role == Qt.ItemDataRole.FontRole and slot.completed:
-            f = QFont()
-            f.setStrikeOut(True)
-            return f
-        if role == Qt.ItemDataRole.ForegroundRole and slot.completed:
-            c = QColor("#eee")
-            c.setAlphaF(0.3)
-            return c
+            return self.color(store.colors[row])
+        if role == CompletedRole:
+            return bool(store.completed[row])
+        if store.completed[row]:
+            if role == Qt.ItemDataRole.FontRole:
+                return self._done_font
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return self._done_color
         return QVariant()
 
     def flags(self, index: QModelIndex) -> Qt.ItemFlag:  # noqa: D401
@@ -160,12 +357,131 @@ class ScheduleModel(QAbstractListModel):
     def setData(self, index: QModelIndex, value: QVariant, role: int = Qt.ItemDataRole.EditRole) -> bool:
         if not index.isValid():
             return False
-        slot = self.slots[index.row()]
+        row = index.row()
+        store = self.store
         if role == Qt.ItemDataRole.EditRole:
-            slot.title = value
-            self.dataChanged.emit(index, index, [role])
-            return True
-        return False
+            store.titles[row] = value
+            self._display[row] = None
+            roles = [Qt.ItemDataRole.DisplayRole, role]
+        elif role == Qt.ItemDataRole.BackgroundRole:
+            store.colors[row] = QColor(value).rgba()
+            roles = [role]
+        elif role == CompletedRole:
+            store.completed[row] = bool(value)
+            roles = [role, Qt.ItemDataRole.FontRole, Qt.ItemDataRole.ForegroundRole]
+        else:
+            return False
+        self.dataChanged.emit(index, index, roles)
+        return True
+
+
+def slot_key(when: datetime) -> str:
+    return when.strftime("%Y-%m-%d %H:%M")
+
+
+class SchedulePersistence(QObject):
+    """Write-behind SQLite persistence for a ScheduleModel.
+
+    Edits only mark their rows dirty. ``DEBOUNCE_MS`` after the last edit the
+    dirty rows are snapshotted and handed to a writer thread, which owns the
+    database connection and writes each batch in one transaction. Slots back
+    in their default state are deleted, so the table only holds edited slots
+    and restoring reads just those in the model's date range, on the same
+    thread, while the window is already up.
+    """
+
+    DEBOUNCE_MS = 500
+    loaded = pyqtSignal(list)
+
+    def __init__(self, model: ScheduleModel, path: Optional[str] = None,
+                 parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.model = model
+        if path is None:
+            folder = QStandardPaths.writableLocation(
+                QStandardPaths.StandardLocation.AppDataLocation)
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, "schedule.sqlite3")
+        self.path = path
+        self._dirty: Set[int] = set()
+        self._restoring = False
+        self._jobs: queue.Queue = queue.Queue()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self.flush)
+        model.dataChanged.connect(self._mark)
+        self.loaded.connect(self._apply)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        store = model.store
+        self._jobs.put(("load", (slot_key(store.when(0)),
+                                 slot_key(store.when(len(store))))))
+
+    def _mark(self, top: QModelIndex, bottom: QModelIndex, roles=()) -> None:
+        if self._restoring:
+            return
+        self._dirty.update(range(top.row(), bottom.row() + 1))
+        self._timer.start()
+
+    def flush(self) -> None:
+        """Queue every dirty row for the writer thread."""
+        self._timer.stop()
+        if not self._dirty:
+            return
+        store = self.model.store
+        batch = [(slot_key(store.when(row)), store.titles[row], store.colors[row],
+                  store.completed[row]) for row in sorted(self._dirty)]
+        self._dirty.clear()
+        self._jobs.put(("write", batch))
+
+    def _run(self) -> None:
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS slots (start TEXT PRIMARY KEY, "
+            "title TEXT NOT NULL, color INTEGER NOT NULL, completed INTEGER NOT NULL)")
+        try:
+            while True:
+                kind, value = self._jobs.get()
+                if kind == "close":
+                    return
+                if kind == "load":
+                    self.loaded.emit(conn.execute(
+                        "SELECT start, title, color, completed FROM slots "
+                        "WHERE start >= ? AND start < ?", value).fetchall())
+                elif kind == "write":
+                    default = [(key,) for key, title, color, completed in value
+                               if not title and color == WHITE and not completed]
+                    edited = [row for row in value
+                              if row[1] or row[2] != WHITE or row[3]]
+                    with conn:
+                        conn.executemany("DELETE FROM slots WHERE start = ?", default)
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO slots VALUES (?, ?, ?, ?)", edited)
+        finally:
+            conn.close()
+
+    def _apply(self, rows: list) -> None:
+        store = self.model.store
+        records = []
+        for key, title, color, completed in rows:
+            row = store.row_at(datetime.strptime(key, "%Y-%m-%d %H:%M"))
+            # Anything edited before the load finished wins.
+            if row not in self._dirty:
+                records.append((row, title, color, completed))
+        self._restoring = True
+        try:
+            self.model.load_slots(records)
+        finally:
+            self._restoring = False
+
+    def close(self) -> None:
+        """Write any pending edits and stop the writer thread."""
+        self.flush()
+        self._jobs.put(("close", None))
+        self._thread.join()
 
 
 class SlotDelegate(QStyledItemDelegate):
@@ -184,33 +500,254 @@ class SlotDelegate(QStyledItemDelegate):
         return container
 
     def setEditorData(self, editor: QWidget, index: QModelIndex) -> None:
-        slot: Slot = index.model().slots[index.row()]  # type: ignore
-        editor.edit.setText(slot.title)  # type: ignore[attr-defined]
+        editor.edit.setText(index.data(Qt.ItemDataRole.EditRole))  # type: ignore[attr-defined]
 
     def setModelData(self, editor: QWidget, model: QAbstractListModel, index: QModelIndex) -> None:
         model.setData(index, editor.edit.text())  # type: ignore[attr-defined]
 
     def choose_color(self, editor: QWidget, index: QModelIndex) -> None:
-        slot: Slot = index.model().slots[index.row()]  # type: ignore
-        color = QColorDialog.getColor(slot.color, editor)
+        color = QColorDialog.getColor(index.data(Qt.ItemDataRole.BackgroundRole), editor)
         if color.isValid():
-            slot.color = color
-            model: QAbstractListModel = index.model()
-            model.dataChanged.emit(index, index, [Qt.ItemDataRole.BackgroundRole])
+            index.model().setData(index, color, Qt.ItemDataRole.BackgroundRole)
+
+
+def suspend_aware_clock() -> Callable[[], float]:
+    """Return a monotonic clock that keeps counting while the machine sleeps."""
+    if hasattr(time, "CLOCK_BOOTTIME"):  # Linux
+        return lambda: time.clock_gettime(time.CLOCK_BOOTTIME)
+    if sys.platform == "darwin":
+        # time.monotonic stops during sleep on macOS; CLOCK_MONOTONIC does not.
+        return lambda: time.clock_gettime(time.CLOCK_MONOTONIC)
+    return time.monotonic  # Windows already counts sleep
+
+
+class Countdown(QObject):
+    """Countdown computed from a deadline on a monotonic clock.
+
+    The time left is always ``deadline - clock()``, so a stalled event loop,
+    a late timer or the machine sleeping cannot make it drift. A precise
+    single-shot timer wakes it just after each whole second, and only then.
+    A wake-up late enough to skip displayed seconds reports how many through
+    ``missed``. Tests can pass a fake ``clock`` and call ``poll`` directly.
+    """
+
+    ticked = pyqtSignal(int)  # whole seconds left, rounded up
+    missed = pyqtSignal(int)
+    finished = pyqtSignal()
+
+    def __init__(self, duration: int, clock: Optional[Callable[[], float]] = None,
+                 parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.duration = duration
+        self.clock = clock or suspend_aware_clock()
+        self.deadline: Optional[float] = None
+        self.missed_ticks = 0
+        self._left = float(duration)
+        self._shown = duration
+        self._ended_at: Optional[float] = None
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.poll)
+
+    @property
+    def running(self) -> bool:
+        return self.deadline is not None
+
+    def remaining(self) -> float:
+        if self.deadline is None:
+            return self._left
+        return max(0.0, self.deadline - self.clock())
+
+    def seconds(self) -> int:
+        return self._shown
+
+    def start(self) -> None:
+        if self.running or self._left <= 0:
+            return
+        self.deadline = self.clock() + self._left
+        self._schedule(self._left)
+
+    def pause(self) -> None:
+        if not self.running:
+            return
+        self._left = self.remaining()
+        self.deadline = None
+        self._timer.stop()
+
+    def reset(self, duration: Optional[int] = None) -> None:
+        self._timer.stop()
+        if duration is not None:
+            self.duration = duration
+        self.deadline = None
+        self._left = float(self.duration)
+        self._shown = self.duration
+
+    def restart(self) -> None:
+        """Start the next period back to back with the one that just ended.
+
+        The new deadline follows the old one, so late wake-ups do not add up
+        over auto-started periods. If even the new deadline has passed (the
+        machine slept through it), the period starts now instead.
+        """
+        now = self.clock()
+        previous = self._ended_at if self._ended_at is not None else now
+        self.reset()
+        self.deadline = previous + self.duration
+        if self.deadline <= now:
+            self.deadline = now + self.duration
+        self.poll()
+
+    def poll(self) -> None:
+        """Update from the clock; runs on every timer wake-up."""
+        if self.deadline is None:
+            return
+        left = self.deadline - self.clock()
+        shown = max(0, math.ceil(left))
+        skipped = self._shown - shown - 1
+        if skipped > 0:
+            self.missed_ticks += skipped
+            self.missed.emit(skipped)
+        if shown != self._shown:
+            self._shown = shown
+            self.ticked.emit(shown)
+        if left <= 0:
+            self._ended_at = self.deadline
+            self.deadline = None
+            self._left = 0.0
+            self.finished.emit()
+            return
+        self._schedule(left)
+
+    def _schedule(self, left: float) -> None:
+        # Sleep until the displayed second changes, landing just past it.
+        until = left - (math.ceil(left) - 1)
+        self._timer.start(int(until * 1000) + 1)
+
+
+class FlashOverlay(QWidget):
+    """Translucent white layer over a window, shown for a while to flash it.
+
+    It replaces a whole-window colorize effect: while hidden it costs
+    nothing, and while shown the rest of the window still paints directly
+    instead of through an offscreen effect buffer.
+    """
+
+    COLOR = QColor(255, 255, 255, 150)
+
+    def __init__(self, parent: QWidget) -> None:
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.hide()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.hide)
+        parent.installEventFilter(self)
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:  # noqa: N802
+        if event.type() == QEvent.Type.Resize and self.isVisible():
+            self.setGeometry(obj.rect())
+        return False
+
+    def flash(self, msecs: int) -> None:
+        self.setGeometry(self.parentWidget().rect())
+        self.raise_()
+        self.show()
+        self._timer.start(msecs)
+
+    def paintEvent(self, event) -> None:  # noqa: D401
+        QPainter(self).fillRect(event.rect(), self.COLOR)
+
+
+def measure_frames(window: "PomodoroApp", frames: int = 120) -> Dict[str, float]:
+    """Time ``frames`` ring repaints of ``window``, in milliseconds.
+
+    Each frame moves the arc by a degree and processes events, so the time
+    covers the paint and whatever effects or overlays it has to go through.
+    """
+    ring = window.ring
+    app = QApplication.instance()
+    app.processEvents()
+    times = []
+    for i in range(frames):
+        ring.value = (i % 360) / 360
+        started = time.perf_counter()
+        app.processEvents()
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return {
+        "mean": sum(times) / len(times),
+        "p95": times[int(len(times) * 0.95)],
+        "max": times[-1],
+    }
+
+
+class StartupProfiler(QObject):
+    """Time named startup phases and report them at the window's first paint.
+
+    ``mark(name)`` closes the phase that ran since the previous mark. The
+    report is printed once the first paint event has been handled, then
+    ``done`` is emitted.
+    """
+
+    done = pyqtSignal()
+
+    def __init__(self, started: float, stream=None) -> None:
+        super().__init__()
+        self.started = started
+        self.stream = stream or sys.stderr
+        self.phases: List[tuple] = []
+        self._last = started
+        self._window: Optional[QWidget] = None
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def watch(self, window: QWidget) -> None:
+        self._window = window
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:  # noqa: N802
+        if obj is self._window and event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            self.mark("event loop")
+            # Queued, so it runs after this paint event has been handled.
+            QTimer.singleShot(0, self.finish)
+        return False
+
+    def finish(self) -> None:
+        self.mark("first paint")
+        total = self._last - self.started
+        print("startup phase          ms", file=self.stream)
+        for name, seconds in self.phases:
+            print(f"{name:<18} {seconds * 1000:7.1f}", file=self.stream)
+        print(f"{'time to first paint':<18} {total * 1000:7.1f}", file=self.stream)
+        self.done.emit()
 
 
 class PomodoroApp(QMainWindow):
     """Main application window."""
 
-    def __init__(self) -> None:
+    SCHEDULE_DAYS = 28
+
+    # "overlay" draws a shadow under the ring only, into its cached pixmap,
+    # and flashes with FlashOverlay; "graphics" uses the original
+    # whole-window effects, which also shadow the header, list and buttons.
+    EFFECTS = ("overlay", "graphics")
+
+    def __init__(self, profiler: Optional[StartupProfiler] = None,
+                 effects: str = "overlay") -> None:
         super().__init__()
+        mark = profiler.mark if profiler is not None else (lambda name: None)
         self.settings = QSettings("codex", "pomodoro")
         self.setWindowTitle("Pomodoro")
         self.resize(800, 480)
         self.timer_duration = 25 * 60
-        self.remaining = self.timer_duration
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.tick)
+        self.countdown = Countdown(self.timer_duration, parent=self)
+        self.countdown.ticked.connect(self.tick)
+        self.countdown.finished.connect(self.finish)
         self.auto_start = False
 
         self.load_theme()
@@ -222,8 +759,10 @@ class PomodoroApp(QMainWindow):
         header = QHBoxLayout()
         self.theme_toggle = QCheckBox("Light", self)
         self.auto_box = QCheckBox("Auto start next", self)
+        self.low_power_box = QCheckBox("Low power", self)
         header.addWidget(self.theme_toggle)
         header.addStretch(1)
+        header.addWidget(self.low_power_box)
         header.addWidget(self.auto_box)
         outer.addLayout(header)
 
@@ -235,12 +774,21 @@ class PomodoroApp(QMainWindow):
         main_layout.setSpacing(20)
         outer.addLayout(main_layout)
 
-        self.ring = RingWidget(self)
+        low_power = self.settings.value("low_power", False, type=bool)
+        self.ring = RingWidget(self, max_fps=30, low_power=low_power)
         main_layout.addWidget(self.ring, 1)
+        self.low_power_box.setChecked(low_power)
+        self.low_power_box.toggled.connect(self.set_low_power)
+        mark("ring")
 
-        self.schedule_model = ScheduleModel()
+        self.schedule_model = ScheduleModel(days=self.SCHEDULE_DAYS)
         self.schedule_view = QListView()
+        # Every row has the same height, so the view never measures rows to
+        # lay out or scroll, however long the schedule gets.
+        self.schedule_view.setUniformItemSizes(True)
         self.schedule_view.setModel(self.schedule_model)
+        self.persistence = SchedulePersistence(self.schedule_model, parent=self)
+        mark("schedule")
         self.schedule_view.setItemDelegate(SlotDelegate(self.schedule_view))
         main_layout.addWidget(self.schedule_view)
 
@@ -270,15 +818,61 @@ class PomodoroApp(QMainWindow):
         self.shortcut_reset.triggered.connect(self.reset)
         self.addAction(self.shortcut_reset)
 
-        self.shadow = QGraphicsDropShadowEffect(self)
-        self.shadow.setBlurRadius(12)
-        self.shadow.setColor(QColor(0, 0, 0, 160))
-        central.setGraphicsEffect(self.shadow)
-
-        self.sound = QSoundEffect(self)
-        self.sound.setSource(QUrl("qrc:/audio/ding.mp3"))
+        self.effects = effects
+        self.shadow = None
+        self.flash_overlay = FlashOverlay(self)
+        # Not needed for the first frame; added once the event loop runs.
+        QTimer.singleShot(0, lambda: self.set_effects(self.effects))
 
+        # Loaded from a zero-delay timer queued by the first paint.
+        self._sound = None
+        self._sound_queued = False
         self.update_display()
+        mark("controls")
+
+    def set_effects(self, effects: str) -> None:
+        """Switch between the "overlay" and "graphics" rendering modes."""
+        if effects not in self.EFFECTS:
+            raise ValueError(f"unknown effects mode: {effects!r}")
+        self.effects = effects
+        if effects == "graphics":
+            self.shadow = QGraphicsDropShadowEffect(self)
+            self.shadow.setBlurRadius(12)
+            self.shadow.setColor(QColor(0, 0, 0, 160))
+            self.centralWidget().setGraphicsEffect(self.shadow)
+        else:
+            # setGraphicsEffect deletes the old effect.
+            self.centralWidget().setGraphicsEffect(None)
+            self.shadow = None
+        self.ring.set_shadow(effects == "overlay")
+
+    def paintEvent(self, event) -> None:  # noqa: D401
+        super().paintEvent(event)
+        if not self._sound_queued:
+            self._sound_queued = True
+            # Queued, so the window is on screen before the audio stack loads.
+            QTimer.singleShot(0, self.load_sound)
+
+    def load_sound(self):
+        """Return the alarm sound, created on first use; None without QtMultimedia.
+
+        Importing QtMultimedia loads the platform audio stack, which is slow
+        and not needed for the first frame, so it happens after the first
+        paint.
+        """
+        if self._sound is None:
+            try:
+                from PyQt6.QtMultimedia import QSoundEffect
+            except ImportError:
+                self._sound = False
+            else:
+                self._sound = QSoundEffect(self)
+                self._sound.setSource(QUrl("qrc:/audio/ding.mp3"))
+        return self._sound or None
+
+    def closeEvent(self, event) -> None:
+        self.persistence.close()
+        super().closeEvent(event)
 
     # Theme handling
     def load_theme(self) -> None:
@@ -296,58 +890,108 @@ class PomodoroApp(QMainWindow):
         self.setPalette(pal)
         self.settings.setValue("dark", dark)
 
+    def set_low_power(self, enabled: bool) -> None:
+        self.ring.set_low_power(enabled)
+        self.settings.setValue("low_power", enabled)
+
     # Timer
     def start(self) -> None:
-        self.timer.start(1000)
+        # Normally loaded after the first paint already; this only does work
+        # if a countdown starts before that.
+        self.load_sound()
+        self.countdown.start()
 
     def pause(self) -> None:
-        self.timer.stop()
+        self.countdown.pause()
 
     def toggle_play(self) -> None:
-        if self.timer.isActive():
+        if self.countdown.running:
             self.pause()
         else:
             self.start()
 
     def reset(self) -> None:
-        self.timer.stop()
-        self.remaining = self.timer_duration
+        self.countdown.reset()
         self.update_display()
         self.ring.set_progress(1.0)
 
-    def tick(self) -> None:
-        if self.remaining > 0:
-            self.remaining -= 1
+    def tick(self, remaining: int) -> None:
+        self.update_display()
+        self.ring.set_progress(remaining / self.timer_duration)
+
+    def finish(self) -> None:
+        sound = self.load_sound()
+        if sound is not None:
+            sound.play()
+        self.flash_screen()
+        if self.auto_start:
+            self.countdown.restart()
             self.update_display()
-            fraction = self.remaining / self.timer_duration
-            self.ring.set_progress(fraction)
-        if self.remaining == 0:
-            self.timer.stop()
-            self.sound.play()
-            self.flash_screen()
-            if self.auto_start:
-                self.remaining = self.timer_duration
-                self.start()
 
     def flash_screen(self) -> None:
+        if self.effects == "overlay":
+            self.flash_overlay.flash(5000)
+            return
         effect = QGraphicsColorizeEffect(self)
         effect.setColor(QColor("white"))
         self.setGraphicsEffect(effect)
         QTimer.singleShot(5000, lambda: self.setGraphicsEffect(None))
 
     def update_display(self) -> None:
-        minutes = self.remaining // 60
-        secs = self.remaining % 60
+        minutes, secs = divmod(self.countdown.seconds(), 60)
         self.ring.set_time_text(f"{minutes:02d}:{secs:02d}")
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print time to first paint by phase and exit")
+    parser.add_argument("--effects", choices=PomodoroApp.EFFECTS, default="overlay",
+                        help="how the shadow and the alarm flash are drawn")
+    parser.add_argument("--measure-frames", type=int, metavar="N",
+                        help="time N ring frames in every effects mode and exit")
+    args = parser.parse_args(argv)
+
+    profiler = None
+    if args.profile_startup:
+        profiler = StartupProfiler(_IMPORT_STARTED)
+        profiler.mark("imports")
     app = QApplication([])
+    # Matches QSettings("codex", "pomodoro"); also names the data folder.
+    app.setOrganizationName("codex")
+    app.setApplicationName("pomodoro")
+    if profiler is not None:
+        profiler.mark("QApplication")
     QFontDatabase.addApplicationFont(":/fonts/Rubik-Regular.ttf")
-    res = PomodoroApp()
+    if profiler is not None:
+        profiler.mark("fonts")
+    res = PomodoroApp(profiler, args.effects)
+    if profiler is not None:
+        profiler.watch(res)
+        profiler.done.connect(res.close)
     res.show()
+    if profiler is not None:
+        profiler.mark("show")
+    if args.measure_frames:
+        QTimer.singleShot(0, lambda: report_frames(res, args.measure_frames))
     app.exec()
 
 
+def report_frames(window: PomodoroApp, frames: int) -> None:
+    """Print ring frame times for each effects mode, steady and flashing."""
+    print("effects   state       mean ms   p95 ms   max ms")
+    for effects in PomodoroApp.EFFECTS:
+        window.set_effects(effects)
+        for state in ("steady", "flashing"):
+            if state == "flashing":
+                window.flash_screen()
+            stats = measure_frames(window, frames)
+            print(f"{effects:<9} {state:<9} {stats['mean']:9.2f} {stats['p95']:8.2f} "
+                  f"{stats['max']:8.2f}")
+            window.flash_overlay.hide()
+            window.setGraphicsEffect(None)
+    window.close()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,167 @@
+"""Headless noise daemon controlled over a Unix domain socket.
+
+Runs BrownNoisePlayer without Tk. Clients send one command per line and get
+one reply line back, ``ok`` or ``ok <json>`` on success and ``error <message>``
+otherwise:
+
+    start | stop | volume <gain> | wave <type> | device <index or name>
+    status | shutdown
+
+Usage:
+
+    python noise_daemon.py serve [--null]
+    python noise_daemon.py start
+    python noise_daemon.py volume 0.01
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+
+from brown_noise_player import GENERATORS, BrownNoisePlayer, NullBackend
+
+
+def default_socket_path():
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime:
+        return os.path.join(runtime, 'codex-noise.sock')
+    return f"/tmp/codex-noise-{os.getuid()}.sock"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            line = raw.decode('utf-8', 'replace').strip()
+            if not line:
+                continue
+            try:
+                reply = self.server.daemon.execute(line)
+            except Exception as exc:  # report, keep serving
+                reply = f"error {exc}"
+            self.wfile.write((reply + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class NoiseDaemon:
+    """Owns a BrownNoisePlayer and serves the line protocol on ``socket_path``."""
+
+    def __init__(self, player, socket_path=None):
+        self.player = player
+        self.socket_path = socket_path or default_socket_path()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = _Server(self.socket_path, _Handler)
+        self.server.daemon = self
+
+    def execute(self, line):
+        command, _, arg = line.partition(' ')
+        command = command.lower()
+        arg = arg.strip()
+        if command == 'start':
+            self.player.start()
+        elif command == 'stop':
+            self.player.stop()
+        elif command == 'volume':
+            self.player.gain = float(arg)
+        elif command == 'wave':
+            if arg not in GENERATORS:
+                return f"error unknown wave type {arg!r}"
+            self.player.set_wave_type(arg)
+        elif command == 'device':
+            # Synchronous, so a bad device is reported to the client.
+            self.player.set_device(int(arg) if arg.isdigit() else arg,
+                                   wait=True)
+        elif command == 'status':
+            return 'ok ' + json.dumps(self.status())
+        elif command == 'shutdown':
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            return f"error unknown command {command!r}"
+        return 'ok'
+
+    def status(self):
+        player = self.player
+        return {
+            'running': player.running,
+            'suspended': player.suspended,
+            'wave': player.wave_type,
+            'volume': player.gain,
+            'device': player.device,
+            'telemetry': player.telemetry.snapshot(),
+        }
+
+    def serve_forever(self):
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.player.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+def send(line, socket_path=None, timeout=5.0):
+    """Send one command to a running daemon and return its reply line."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall((line + '\n').encode('utf-8'))
+        with sock.makefile('r', encoding='utf-8') as f:
+            return f.readline().strip()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless noise daemon")
+    parser.add_argument('--socket', help="control socket path")
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help="run the daemon")
+    serve.add_argument('--null', action='store_true',
+                       help="play into a null backend instead of a device")
+    serve.add_argument('--device')
+    serve.add_argument('--sample-rate', type=int, default=44100)
+    serve.add_argument('--block-size', type=int, default=1024)
+    for name in ('start', 'stop', 'status', 'shutdown'):
+        sub.add_parser(name)
+    sub.add_parser('volume').add_argument('value')
+    sub.add_parser('wave').add_argument('value', choices=list(GENERATORS))
+    sub.add_parser('device').add_argument('value')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        device = args.device
+        if device is not None and device.isdigit():
+            device = int(device)
+        try:
+            player = BrownNoisePlayer(
+                sample_rate=args.sample_rate, block_size=args.block_size,
+                device=device, backend=NullBackend() if args.null else None)
+        except RuntimeError as exc:  # no PortAudio
+            parser.error(f"{exc}; or serve with --null")
+        daemon = NoiseDaemon(player, args.socket)
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(
+            target=daemon.server.shutdown, daemon=True).start())
+        print(f"Listening on {daemon.socket_path}")
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    line = args.command
+    if getattr(args, 'value', None) is not None:
+        line += ' ' + args.value
+    reply = send(line, args.socket)
+    print(reply)
+    return 0 if reply.startswith('ok') else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,139 @@
 import tkinter as tk
 from tkinter import filedialog
+import csv
+import json
 import math
-from datetime import datetime, timedelta
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime
 
 
 """A simple Tkinter Pomodoro timer with a continuous 60 minute ring.
 
 Click the ring to choose a number of minutes. The selected portion glows
-red while the remaining time is tracked in real time using the system clock.
+red while the remaining time is tracked against a monotonic clock, so the
+countdown is unaffected by wall-clock changes.
 """
 
+# Schedule lines start with a slot time, optionally with a date in front.
+SLOT_RE = re.compile(r"(\d{4}-\d{2}-\d{2} )?\d{1,2}:\d{2}")
+# Lines per Text insert and per queue item during import.
+BATCH_LINES = 500
+SCHEDULE_TYPES = [
+    ("Schedules", "*.txt *.csv *.json"),
+    ("CSV (time,text)", "*.csv"),
+    ("JSON", "*.json"),
+    ("All Files", "*.*"),
+]
+
+
+def slot_key(line):
+    """Return the slot time a schedule line starts with, or None."""
+    match = SLOT_RE.match(line)
+    return match.group(0) if match else None
+
+
+def split_line(line):
+    """Split a schedule line into ``(time, text)`` for structured formats."""
+    key = slot_key(line) or ""
+    return key, line[len(key):].lstrip(" ")
+
+
+def join_line(key, text):
+    return f"{key} {text}" if key else text
+
+
+def read_schedule(path, progress=lambda fraction: None):
+    """Yield the lines of a plain text, CSV or JSON schedule file.
+
+    CSV files have a ``time,text`` header and JSON files hold a list of
+    ``{"time": ..., "text": ...}`` objects; both become ``"time text"`` lines.
+    Text and CSV files are read line by line and ``progress`` is called with
+    the fraction of the file consumed so far.
+    """
+    size = os.path.getsize(path) or 1
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "rb") as f:
+        def lines():
+            done = 0
+            for raw in f:
+                done += len(raw)
+                progress(done / size)
+                yield raw.decode("utf-8")
+
+        if ext == ".csv":
+            for row in csv.DictReader(lines()):
+                yield join_line(row.get("time"), row.get("text") or "")
+        elif ext == ".json":
+            rows = json.load(f)
+            progress(1.0)
+            for row in rows:
+                yield join_line(row.get("time"), row.get("text", ""))
+        else:
+            for line in lines():
+                yield line.rstrip("\r\n")
+
+
+def write_schedule(path, lines, progress=lambda fraction: None):
+    """Write schedule ``lines`` in the format given by the extension of ``path``.
+
+    The file is written next to ``path`` and moved into place at the end, so a
+    failed or cancelled export leaves any existing file untouched. ``progress``
+    may raise to abort.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    tmp = path + ".tmp"
+    total = len(lines) or 1
+    try:
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            if ext == ".json":
+                rows = []
+                for i, line in enumerate(lines):
+                    key, text = split_line(line)
+                    rows.append({"time": key, "text": text})
+                    if i % BATCH_LINES == 0:
+                        progress(i / total)
+                json.dump(rows, f, indent=1)
+            elif ext == ".csv":
+                writer = csv.writer(f)
+                writer.writerow(["time", "text"])
+                for i, line in enumerate(lines):
+                    writer.writerow(split_line(line))
+                    if i % BATCH_LINES == 0:
+                        progress(i / total)
+            else:
+                for i, line in enumerate(lines):
+                    f.write(line + "\n")
+                    if i % BATCH_LINES == 0:
+                        progress(i / total)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+class TransferCancelled(Exception):
+    pass
+
+
 class PomodoroTimer:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Pomodoro Timer")
+        # Countdown deadline on the time.monotonic() clock.
         self.end_time = None
+        # Last value written to each widget, so ticks only touch what changed.
+        self._shown = {}
+        self._tick_id = None
+        # Slot time -> Text mark on its line; marks follow edits to the text.
+        self.slot_marks = {}
+        # Import/export runs on a worker; see start_transfer.
+        self._transfer = None
+        # Schedule lines from before an import, put back if it does not finish.
+        self._restore = None
 
         # layout frames
         self.left_frame = tk.Frame(self.root)
@@ -62,9 +181,11 @@ class PomodoroTimer:
         self.button_frame.pack(fill=tk.X, pady=(5, 0))
         tk.Button(self.button_frame, text="Import", command=self.import_schedule).pack(side=tk.LEFT, padx=5)
         tk.Button(self.button_frame, text="Export", command=self.export_schedule).pack(side=tk.LEFT)
+        self.progress_label = tk.Label(self.button_frame)
+        self.cancel_button = tk.Button(self.button_frame, text="Cancel", command=self.cancel_transfer)
         self.populate_schedule()
 
-        self.update_clock()
+        self.tick()
 
     def draw_ring(self):
         box = (
@@ -106,72 +227,237 @@ class PomodoroTimer:
     def set_timer(self, minutes):
         if minutes <= 0:
             self.end_time = None
-            self.timer_label.config(text="00:00")
+            self.set_text(self.timer_label, "00:00")
             self.highlight_minutes(0)
             return
-        self.end_time = datetime.now() + timedelta(minutes=minutes)
-        self.highlight_minutes(minutes)
-        self.update_timer()
+        self.end_time = time.monotonic() + minutes * 60
+        # Re-align the tick to the new countdown's second boundaries.
+        self.reschedule()
+
+    def changed(self, key, value):
+        """Remember ``value`` under ``key``; return True if it is new."""
+        if self._shown.get(key) == value:
+            return False
+        self._shown[key] = value
+        return True
+
+    def set_text(self, label, text):
+        if self.changed(label, text):
+            label.config(text=text)
 
     def highlight_minutes(self, minutes):
         """Draw a continuous arc highlighting the selected minutes."""
-        extent = -minutes * 6
-        self.canvas.itemconfig(self.progress_arc, extent=extent)
+        if self.changed("arc", minutes):
+            self.canvas.itemconfig(self.progress_arc, extent=-minutes * 6)
+
+    def clear_schedule(self):
+        self.schedule_text.delete("1.0", tk.END)
+        if self.slot_marks:
+            self.schedule_text.mark_unset(*self.slot_marks.values())
+        self.slot_marks = {}
+        self._shown.pop("slot", None)
+
+    def append_lines(self, lines):
+        """Append ``lines`` to the schedule and mark the slot times they start with."""
+        text = self.schedule_text
+        first = int(text.index("end-1c").split(".")[0])
+        text.insert("end-1c", "".join(line + "\n" for line in lines))
+        for offset, line in enumerate(lines):
+            key = slot_key(line)
+            if key is not None and key not in self.slot_marks:
+                mark = "slot_" + re.sub(r"\D", "", key)
+                text.mark_set(mark, f"{first + offset}.0")
+                text.mark_gravity(mark, tk.LEFT)
+                self.slot_marks[key] = mark
 
     def populate_schedule(self):
         """Fill the schedule text box with 15 minute slots."""
-        self.schedule_text.delete("1.0", tk.END)
-        for hour in range(24):
-            for quarter in range(4):
-                mins = quarter * 15
-                self.schedule_text.insert(tk.END, f"{hour:02d}:{mins:02d} \n")
+        self.clear_schedule()
+        self.append_lines([f"{hour:02d}:{quarter * 15:02d} "
+                           for hour in range(24) for quarter in range(4)])
         self.schedule_text.tag_configure("current", background="lightyellow")
 
-    def highlight_schedule(self):
-        now = datetime.now()
-        total_minutes = now.hour * 60 + now.minute
-        index = total_minutes // 15 + 1
+    def highlight_schedule(self, now=None):
+        """Tag the current 15 minute slot; only does work when it rolls over."""
+        now = now or datetime.now()
+        start = now.replace(minute=now.minute - now.minute % 15)
+        # Prefer a dated slot from a multi-day schedule, then a plain time.
+        mark = (self.slot_marks.get(start.strftime("%Y-%m-%d %H:%M"))
+                or self.slot_marks.get(start.strftime("%H:%M")))
+        if not self.changed("slot", mark):
+            return
         self.schedule_text.tag_remove("current", "1.0", tk.END)
-        line_start = f"{index}.0"
-        self.schedule_text.tag_add("current", line_start, f"{index}.end")
-        self.schedule_text.see(line_start)
+        if mark is None:
+            return
+        self.schedule_text.tag_add("current", f"{mark} linestart", f"{mark} lineend")
+        self.schedule_text.see(mark)
 
     def import_schedule(self):
-        """Load schedule text from a file into the text widget."""
-        filename = filedialog.askopenfilename(
-            filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")]
-        )
-        if filename:
-            with open(filename, "r", encoding="utf-8") as f:
-                self.schedule_text.delete("1.0", tk.END)
-                self.schedule_text.insert(tk.END, f.read())
+        """Stream a schedule file into the text widget without blocking the UI.
+
+        A worker thread parses the file and the Tk thread inserts it
+        ``BATCH_LINES`` at a time. If the import is cancelled or fails, the
+        previous schedule is restored.
+        """
+        if self._transfer is not None:
+            return
+        filename = filedialog.askopenfilename(filetypes=SCHEDULE_TYPES)
+        if not filename:
+            return
+        self._restore = self.schedule_text.get("1.0", "end-1c").splitlines()
+        self.clear_schedule()
+        self.schedule_text.config(state=tk.DISABLED)
+
+        def work(report, cancelled):
+            batch = []
+            for line in read_schedule(filename, report):
+                batch.append(line)
+                if len(batch) >= BATCH_LINES:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        self.start_transfer("Importing", work, self.append_lines)
 
     def export_schedule(self):
-        """Save the current schedule text to a file."""
+        """Save the schedule as text, CSV or JSON on a worker thread."""
+        if self._transfer is not None:
+            return
         filename = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")],
-        )
-        if filename:
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(self.schedule_text.get("1.0", tk.END))
+            defaultextension=".txt", filetypes=SCHEDULE_TYPES)
+        if not filename:
+            return
+        # One snapshot on the Tk thread; formatting and writing happen off it.
+        lines = self.schedule_text.get("1.0", "end-1c").splitlines()
+
+        def work(report, cancelled):
+            def progress(fraction):
+                if cancelled.is_set():
+                    raise TransferCancelled
+                report(fraction)
+            write_schedule(filename, lines, progress)
+            return iter(())
+
+        self.start_transfer("Exporting", work)
+
+    def start_transfer(self, title, work, consume=None):
+        """Run ``work(report, cancelled)`` on a worker thread.
+
+        ``work`` returns an iterable of items; each is handed to ``consume``
+        on the Tk thread. ``report(fraction)`` updates the progress label.
+        Only a few items are queued at a time, so a slow consumer throttles
+        the worker instead of buffering the whole file.
+        """
+        items = queue.Queue(maxsize=4)
+        cancelled = threading.Event()
+        state = {"progress": 0.0}
+
+        def put(item):
+            while not cancelled.is_set():
+                try:
+                    items.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def run():
+            status = "done"
+            try:
+                for item in work(lambda f: state.update(progress=f), cancelled):
+                    if cancelled.is_set():
+                        break
+                    put(("item", item))
+            except TransferCancelled:
+                pass
+            except (OSError, ValueError, KeyError, TypeError, AttributeError,
+                    csv.Error) as exc:
+                status = f"failed: {exc}"
+            if cancelled.is_set():
+                status = "cancelled"
+            # poll_transfer keeps draining until it sees this, so a blocking
+            # put cannot deadlock.
+            items.put(("finished", status))
+
+        self._transfer = (items, cancelled, state, title, consume)
+        self.progress_label.config(text=f"{title} 0%")
+        self.progress_label.pack(side=tk.LEFT, padx=5)
+        self.cancel_button.pack(side=tk.LEFT)
+        threading.Thread(target=run, daemon=True).start()
+        self.root.after(50, self.poll_transfer)
+
+    def cancel_transfer(self):
+        if self._transfer is not None:
+            self._transfer[1].set()
+
+    def poll_transfer(self):
+        items, cancelled, state, title, consume = self._transfer
+        # Bound the work per poll so the window stays responsive.
+        for _ in range(4):
+            try:
+                kind, value = items.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "item" and not cancelled.is_set():
+                self.schedule_text.config(state=tk.NORMAL)
+                consume(value)
+                self.schedule_text.config(state=tk.DISABLED)
+            elif kind == "finished":
+                self.finish_transfer(title, value)
+                return
+        self.set_text(self.progress_label, f"{title} {state['progress']:.0%}")
+        self.root.after(50, self.poll_transfer)
+
+    def finish_transfer(self, title, status):
+        self._transfer = None
+        self.schedule_text.config(state=tk.NORMAL)
+        restore, self._restore = self._restore, None
+        if restore is not None and status != "done":
+            self.clear_schedule()
+            self.append_lines(restore)
+        self.cancel_button.pack_forget()
+        self.progress_label.config(text=f"{title} {status}")
+        self._shown.pop(self.progress_label, None)
+        self._shown.pop("slot", None)
+        self.highlight_schedule()
 
     def update_timer(self):
-        if not self.end_time:
-            return
-        remaining = int((self.end_time - datetime.now()).total_seconds())
-        if remaining < 0:
-            remaining = 0
+        """Show the countdown and return the seconds left, 0 when idle."""
+        if self.end_time is None:
+            return 0
+        left = max(0.0, self.end_time - time.monotonic())
+        remaining = int(left)
         mins, secs = divmod(remaining, 60)
-        self.timer_label.config(text=f"{mins:02d}:{secs:02d}")
+        self.set_text(self.timer_label, f"{mins:02d}:{secs:02d}")
         self.highlight_minutes((remaining + 59) // 60)
-        if remaining > 0:
-            self.root.after(1000, self.update_timer)
+        return left
 
-    def update_clock(self):
-        self.time_label.config(text=datetime.now().strftime("%H:%M:%S"))
-        self.highlight_schedule()
-        self.root.after(1000, self.update_clock)
+    def update_clock(self, wall=None):
+        now = datetime.fromtimestamp(wall if wall is not None else time.time())
+        self.set_text(self.time_label, now.strftime("%H:%M:%S"))
+        self.highlight_schedule(now)
+
+    def tick(self):
+        """Refresh both displays, then sleep to the next second boundary.
+
+        A single ``after`` callback drives the clock and the countdown. It
+        wakes at whichever comes first: the next wall-clock second or the
+        next whole second left on the countdown. Each wake-up computes the
+        delay afresh, so neither display drifts.
+        """
+        wall = time.time()
+        self.update_clock(wall)
+        delay = 1 - wall % 1
+        left = self.update_timer()
+        if left:
+            delay = min(delay, left % 1 or 1.0)
+        # Land just past the boundary rather than just before it.
+        self._tick_id = self.root.after(int(delay * 1000) + 1, self.tick)
+
+    def reschedule(self):
+        if self._tick_id is not None:
+            self.root.after_cancel(self._tick_id)
+        self.tick()
 
     def run(self):
         self.root.mainloop()
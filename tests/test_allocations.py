@@ -0,0 +1,59 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from brown_noise_player import GENERATORS, BrownNoisePlayer, NullBackend
+
+BLOCK = 4096
+# Python-level bookkeeping (views, ufunc iterators) costs a few hundred bytes
+# per call; a temporary sample buffer would cost at least one float32 block of
+# 4 * BLOCK bytes.
+LIMIT = BLOCK
+
+
+def _peak(player, out, before=None, blocks=8):
+    """Largest traced allocation peak over single callbacks."""
+    worst = 0
+    for i in range(blocks):
+        if before is not None:
+            before(i)
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        player.audio_callback(out, BLOCK, None, None)
+        worst = max(worst, tracemalloc.get_traced_memory()[1] - current)
+    return worst
+
+
+@pytest.fixture
+def trace():
+    tracemalloc.start()
+    yield
+    tracemalloc.stop()
+
+
+@pytest.mark.parametrize('channels', [1, 2])
+@pytest.mark.parametrize('wave_type', list(GENERATORS))
+def test_callback_does_not_allocate(trace, wave_type, channels):
+    player = BrownNoisePlayer(block_size=BLOCK, channels=channels, seed=0,
+                              idle_timeout=None,
+                              backend=NullBackend(realtime=False))
+    other = 'White' if wave_type != 'White' else 'Brown'
+    out = np.zeros((BLOCK, channels), dtype=np.float32)
+    try:
+        player.start()
+        # Warm up both waves once so lazily sized buffers already exist.
+        for wave in (other, wave_type):
+            player.set_wave_type(wave)
+            for _ in range(3):
+                player.audio_callback(out, BLOCK, None, None)
+
+        assert _peak(player, out) < LIMIT
+        # A new gain every block ramps across each one.
+        assert _peak(player, out,
+                     before=lambda i: setattr(player, 'gain', 0.01 * (i + 2))) < LIMIT
+        # Every block crossfades from the other wave.
+        assert _peak(player, out, before=lambda i: player.set_wave_type(
+            wave_type if i % 2 else other)) < LIMIT
+    finally:
+        player.close()
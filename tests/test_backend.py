@@ -0,0 +1,13 @@
+import pytest
+
+import brown_noise_player
+from brown_noise_player import BrownNoisePlayer
+
+
+def test_missing_portaudio_is_reported(monkeypatch):
+    cause = OSError("PortAudio library not found")
+    monkeypatch.setattr(brown_noise_player, 'sd', None)
+    monkeypatch.setattr(brown_noise_player, '_sd_error', cause)
+    with pytest.raises(RuntimeError, match="PortAudio library not found") as info:
+        BrownNoisePlayer()
+    assert info.value.__cause__ is cause
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from brown_noise_player import BrownFilter, brown_reference
+
+# Odd block lengths so chunk boundaries (every 256 samples) fall mid-block.
+BLOCKS = (1, 255, 300, 97, 513, 1000)
+
+
+def _run(filt, white):
+    out, start = [], 0
+    for n in BLOCKS:
+        out.append(filt.process(white[start:start + n]))
+        start += n
+    return np.concatenate(out)
+
+
+@pytest.mark.parametrize('dtype, rtol, atol', [
+    (np.float64, 1e-9, 1e-12),
+    (np.float32, 1e-4, 1e-5),
+])
+def test_matches_reference_across_blocks(dtype, rtol, atol):
+    white = np.random.default_rng(1).standard_normal(sum(BLOCKS))
+    filt = BrownFilter(dtype=dtype)
+    got = _run(filt, white.astype(dtype))
+    expected, state = brown_reference(white)
+    assert got.dtype == dtype
+    np.testing.assert_allclose(got, expected, rtol=rtol, atol=atol)
+    np.testing.assert_allclose(filt.state[0], state, rtol=rtol, atol=atol)
+
+
+def test_channels_keep_their_own_state():
+    white = np.random.default_rng(2).standard_normal((sum(BLOCKS), 2))
+    filt = BrownFilter(dtype=np.float64, channels=2)
+    got = _run(filt, white)
+    for c in range(2):
+        expected, state = brown_reference(white[:, c])
+        np.testing.assert_allclose(got[:, c], expected, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(filt.state[c], state, rtol=1e-9, atol=1e-12)
+
+
+def test_reset_clears_state():
+    white = np.random.default_rng(3).standard_normal(300)
+    filt = BrownFilter(dtype=np.float64)
+    first = filt.process(white)
+    filt.reset()
+    np.testing.assert_array_equal(filt.process(white), first)
+
+
+def test_rejects_wrong_channel_count():
+    with pytest.raises(ValueError):
+        BrownFilter(channels=2).process(np.zeros((16, 3), dtype=np.float32))
@@ -0,0 +1,109 @@
+import copy
+import time
+
+import numpy as np
+import pytest
+
+from brown_noise_player import BrownNoisePlayer, NullBackend
+
+BLOCK = 256
+
+
+@pytest.fixture
+def player():
+    player = BrownNoisePlayer(block_size=BLOCK, seed=0, idle_timeout=None,
+                              backend=NullBackend(realtime=False))
+    player.start()
+    yield player
+    player.close()
+
+
+def test_set_tones_crossfades_over_one_block(player):
+    block = np.zeros((BLOCK, 1), dtype=np.float32)
+    player.set_wave_type('Sine')
+    player._render(block)
+    old = player.generators['Sine']
+    player.set_tones([(220, 0.5), (330, 0.5)])
+    new = player.generators['Sine']
+    # Nothing changes for the render side until it drains the command.
+    assert player._source() is old
+
+    fade_out, fade_in = np.empty_like(block), np.empty_like(block)
+    copy.deepcopy(old).render(fade_out)
+    expected_new = copy.deepcopy(new)
+    expected_new.render(fade_in)
+    expected = fade_out * player._xfade_out + fade_in * player._xfade_in
+
+    player._render(block)
+    assert player._source() is new
+    np.testing.assert_allclose(block, expected, atol=1e-6)
+    player._render(block)
+    expected_new.render(fade_in)
+    np.testing.assert_allclose(block, fade_in, atol=1e-6)
+
+
+def test_set_spectrum_swaps_on_the_render_side(player):
+    block = np.zeros((BLOCK, 1), dtype=np.float32)
+    player.set_spectrum(tilt=-4.5)
+    player._render(block)
+    first = player.generators['Custom']
+    assert player._source() is first
+    player.set_spectrum(tilt=4.5)
+    assert player._source() is first
+    player._render(block)
+    assert player._source() is player.generators['Custom']
+    assert player._xfade_from is None
+
+
+def test_ring_crossfade_survives_a_retune():
+    # Not started, so the producer thread stays asleep and the test renders
+    # the ring blocks itself.
+    player = BrownNoisePlayer(block_size=BLOCK, lookahead=4, seed=0,
+                              idle_timeout=None,
+                              backend=NullBackend(realtime=False))
+    try:
+        assert player.retune() == 2 * BLOCK
+        out = np.zeros((2 * BLOCK, 1), dtype=np.float32)
+        player.audio_callback(out, 2 * BLOCK, None, None)
+
+        sine = copy.deepcopy(player.generators['Sine'])
+        sine.reset()
+        expected = np.empty_like(player._block)
+        sine.render(expected)
+        player.render_controls.push('wave', 'Sine')
+        player._render(player._block)
+        # The producer still renders BLOCK frames, and its crossfade must
+        # end fully on the new wave.
+        assert len(player._block) == BLOCK
+        np.testing.assert_allclose(player._block[-1], expected[-1], atol=1e-6)
+    finally:
+        player.close()
+
+
+def test_stopped_ring_player_keeps_the_latest_wave():
+    player = BrownNoisePlayer(block_size=BLOCK, lookahead=4, seed=0,
+                              idle_timeout=None,
+                              backend=NullBackend(realtime=False))
+    try:
+        player.start()
+        player.stop()
+        waves = ['White', 'Brown'] * 100 + ['Pink']
+        for wave in waves:
+            player.set_wave_type(wave)
+        player.start()
+        deadline = time.monotonic() + 5
+        while player._active_wave != 'Pink' and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert player._active_wave == 'Pink'
+    finally:
+        player.close()
+
+
+def test_full_queue_catches_up_with_the_latest_state(player):
+    player.render_controls.capacity = 4
+    for wave in ['White', 'Brown', 'Sine', 'White', 'Brown', 'Pink']:
+        player.set_wave_type(wave)
+    assert player.render_controls.overflowed
+    player._render(np.zeros((BLOCK, 1), dtype=np.float32))
+    assert player._active_wave == 'Pink'
+    assert not player.render_controls.overflowed
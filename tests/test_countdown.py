@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+QtCore = pytest.importorskip('PyQt6.QtCore')
+
+from main import Countdown  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope='module', autouse=True)
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _countdown(clock, duration=5):
+    # Signals reach these lists synchronously; no event loop is needed.
+    countdown = Countdown(duration, clock=clock)
+    events = {'ticked': [], 'missed': [], 'finished': 0}
+    countdown.ticked.connect(events['ticked'].append)
+    countdown.missed.connect(events['missed'].append)
+
+    def finished():
+        events['finished'] += 1
+    countdown.finished.connect(finished)
+    return countdown, events
+
+
+def test_ticks_follow_the_clock(clock):
+    countdown, events = _countdown(clock)
+    countdown.start()
+    for second in range(1, 6):
+        clock.now = second + 0.001
+        countdown.poll()
+    assert events['ticked'] == [4, 3, 2, 1, 0]
+    assert events['missed'] == []
+    assert events['finished'] == 1
+    assert not countdown.running
+
+
+def test_stall_reports_missed_seconds(clock):
+    countdown, events = _countdown(clock, duration=10)
+    countdown.start()
+    clock.now = 1.001
+    countdown.poll()
+    # The event loop stalls for a few seconds: 8, 7 and 6 are never shown.
+    clock.now = 4.5
+    countdown.poll()
+    assert events['ticked'] == [9, 6]
+    assert events['missed'] == [2]
+    assert countdown.missed_ticks == 2
+    assert countdown.remaining() == pytest.approx(5.5)
+
+
+def test_pause_and_resume_keep_the_time_left(clock):
+    countdown, events = _countdown(clock)
+    countdown.start()
+    clock.now = 1.5
+    countdown.pause()
+    assert countdown.remaining() == pytest.approx(3.5)
+    clock.now = 100.0
+    countdown.poll()
+    assert countdown.remaining() == pytest.approx(3.5)
+    assert events['finished'] == 0
+    countdown.start()
+    clock.now = 101.0
+    countdown.poll()
+    assert countdown.seconds() == 3
+    clock.now = 103.5
+    countdown.poll()
+    assert events['ticked'][-1] == 0
+    assert events['finished'] == 1
+
+
+def test_restart_chains_from_the_previous_deadline(clock):
+    countdown, events = _countdown(clock)
+    countdown.start()
+    # Woken 0.3 s late for the end of the first period.
+    clock.now = 5.3
+    countdown.poll()
+    assert events['finished'] == 1
+    countdown.restart()
+    assert countdown.deadline == pytest.approx(10.0)
+    assert countdown.seconds() == 5
+    clock.now = 10.0
+    countdown.poll()
+    assert events['finished'] == 2
+
+
+def test_restart_after_sleeping_past_the_deadline_starts_now(clock):
+    countdown, events = _countdown(clock)
+    countdown.start()
+    clock.now = 5.0
+    countdown.poll()
+    # The machine slept through the whole next period.
+    clock.now = 60.0
+    countdown.restart()
+    assert countdown.deadline == pytest.approx(65.0)
+    assert countdown.remaining() == pytest.approx(5.0)
+    assert events['finished'] == 1
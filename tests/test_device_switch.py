@@ -0,0 +1,55 @@
+import time
+
+from brown_noise_player import BrownNoisePlayer, NullBackend
+
+
+def _player(realtime):
+    return BrownNoisePlayer(block_size=256, seed=0, idle_timeout=None,
+                            backend=NullBackend(realtime=realtime))
+
+
+def test_switch_hands_over_to_the_new_stream():
+    player = _player(realtime=True)
+    try:
+        player.start()
+        old = player.stream
+        player.set_device(3).join()
+        assert player.device == 3
+        assert player.stream is not old and player.stream.device == 3
+        deadline = time.monotonic() + player.SWITCH_TIMEOUT + 1
+        while not old.closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert old.closed
+    finally:
+        player.close()
+
+
+def test_lifecycle_is_free_while_the_new_device_warms_up():
+    # Streams that never call back keep the switch waiting for the timeout.
+    player = _player(realtime=False)
+    player.SWITCH_TIMEOUT = 0.5
+    try:
+        player.start()
+        started = time.monotonic()
+        thread = player.set_device(2)
+        player.gain = 0.2
+        player.stop()
+        player.start()
+        assert time.monotonic() - started < player.SWITCH_TIMEOUT
+        assert thread.is_alive()
+        thread.join()
+        assert player.device == 2 and player.stream.device == 2
+        assert player.stream.active
+    finally:
+        player.close()
+
+
+def test_switch_while_suspended_swaps_streams():
+    player = _player(realtime=False)
+    try:
+        old = player.stream
+        player.set_device(5).join()
+        assert player.stream.device == 5 and not player.stream.active
+        assert old.closed
+    finally:
+        player.close()
@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from brown_noise_player import BrownNoisePlayer, NullBackend, SharedRing
+
+BLOCK = 256
+
+
+def _wait_for(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def player():
+    player = BrownNoisePlayer(block_size=BLOCK, seed=0, idle_timeout=None,
+                              backend=NullBackend(), process=True)
+    yield player
+    player.close()
+
+
+def test_shared_ring_is_visible_to_an_attached_reader():
+    ring = SharedRing(4 * BLOCK, channels=2)
+    try:
+        other = SharedRing(4 * BLOCK, channels=2, name=ring.name)
+        try:
+            ring.write(ring.buffer[:BLOCK] + 0.5)
+            ring.beat()
+            assert other.write_pos == BLOCK and other.heartbeat == 1
+            assert other.read_into(other.buffer[BLOCK:2 * BLOCK]) == BLOCK
+            assert ring.read_pos[0] == BLOCK
+            assert (ring.buffer[BLOCK:2 * BLOCK] == 0.5).all()
+        finally:
+            other.close()
+    finally:
+        ring.close()
+
+
+def test_watchdog_restarts_a_killed_worker(player):
+    ring, worker = player.ring, player.worker
+    player.start()
+    # A spawned child imports numpy first; allow for a slow machine.
+    assert _wait_for(lambda: ring.write_pos > 0, worker.STARTUP_TIMEOUT)
+    worker.process.kill()
+    assert _wait_for(lambda: worker.restarts == 1, 5)
+    written = ring.write_pos
+    assert _wait_for(lambda: ring.write_pos > written, worker.STARTUP_TIMEOUT)
+    assert worker.process.is_alive()
+    assert worker.restarts == 1
@@ -0,0 +1,24 @@
+import time
+
+from brown_noise_player import BrownNoisePlayer, NullBackend
+
+
+def test_only_the_last_stop_schedules_the_suspend():
+    player = BrownNoisePlayer(block_size=256, idle_timeout=0.5,
+                              backend=NullBackend(realtime=False))
+    try:
+        player.start()
+        player.stop()
+        player.stop()
+        player.start()
+        time.sleep(0.3)
+        player.stop()
+        # The timer from the first stops would fire 0.2 s from now.
+        time.sleep(0.35)
+        assert not player.suspended
+        deadline = time.monotonic() + 2
+        while not player.suspended and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert player.suspended
+    finally:
+        player.close()
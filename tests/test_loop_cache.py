@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+
+from brown_noise_player import BrownNoisePlayer, LoopCache, NullBackend
+
+
+def _player(tmp_path):
+    cache = LoopCache(directory=str(tmp_path), loop_seconds=0.1,
+                      crossfade_seconds=0.01, chunk_size=1024)
+    return BrownNoisePlayer(block_size=256, seed=0, loop_cache=cache,
+                            idle_timeout=None,
+                            backend=NullBackend(realtime=False))
+
+
+def test_table_follows_the_player_tones(tmp_path):
+    player = _player(tmp_path)
+    try:
+        player.set_wave_type('Sine')
+        before = player.tables['Sine']
+        player.set_tones([(200, 0.5), (300, 0.5)])
+        after = player.tables['Sine']
+        assert after is not before
+        assert not np.array_equal(np.asarray(after.table),
+                                  np.asarray(before.table))
+        expected = player.loop_cache.path('Sine', player.sample_rate,
+                                          player.generators['Sine'])
+        # The table for the old voices can never be hit again.
+        assert [p for p in tmp_path.iterdir() if p.name.startswith('Sine-')] == [
+            tmp_path / os.path.basename(expected)]
+    finally:
+        player.close()
+
+
+def test_default_tables_are_shared(tmp_path):
+    player = _player(tmp_path)
+    try:
+        path = player.loop_cache.path('Brown', player.sample_rate,
+                                      player.generators['Brown'])
+        assert path == player.loop_cache.path('Brown', player.sample_rate)
+    finally:
+        player.close()
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from brown_noise_player import BrownNoisePlayer, NullBackend
+from noise_daemon import NoiseDaemon, send
+
+
+class OneDeviceBackend(NullBackend):
+    """Null backend with a single output device, index 1."""
+
+    def OutputStream(self, device=None, **kwargs):
+        if device not in (None, 1):
+            raise ValueError(f"no such device {device!r}")
+        return super().OutputStream(device=device, **kwargs)
+
+
+@pytest.fixture
+def served(tmp_path):
+    player = BrownNoisePlayer(backend=OneDeviceBackend(realtime=False),
+                              idle_timeout=None)
+    daemon = NoiseDaemon(player, socket_path=str(tmp_path / 'noise.sock'))
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    yield daemon, thread
+    if thread.is_alive():
+        send('shutdown', daemon.socket_path)
+        thread.join(5)
+
+
+def test_commands_drive_the_player(served):
+    daemon, _ = served
+    player, path = daemon.player, daemon.socket_path
+    assert send('start', path) == 'ok'
+    assert player.running and not player.suspended
+    assert send('volume 0.05', path) == 'ok'
+    assert player.gain == 0.05
+    assert send('wave Pink', path) == 'ok'
+    assert player.wave_type == 'Pink'
+    assert send('wave Plaid', path) == "error unknown wave type 'Plaid'"
+    assert player.wave_type == 'Pink'
+    assert send('volume loud', path).startswith('error ')
+    assert send('dance', path) == "error unknown command 'dance'"
+
+    reply = send('status', path)
+    assert reply.startswith('ok ')
+    status = json.loads(reply[3:])
+    assert status['running'] is True
+    assert status['wave'] == 'Pink'
+    assert status['volume'] == 0.05
+
+    assert send('stop', path) == 'ok'
+    assert not player.running
+
+
+def test_device_errors_reach_the_client(served):
+    daemon, _ = served
+    player, path = daemon.player, daemon.socket_path
+    assert send('start', path) == 'ok'
+    assert send('device 7', path) == "error no such device 7"
+    assert player.device is None
+    assert send('device 1', path) == 'ok'
+    assert player.device == 1 and player.stream.device == 1
+
+
+def test_shutdown_closes_the_player(served, tmp_path):
+    daemon, thread = served
+    assert send('shutdown', daemon.socket_path) == 'ok'
+    thread.join(5)
+    assert not thread.is_alive()
+    assert daemon.player._closed.is_set()
+    assert not (tmp_path / 'noise.sock').exists()
+
+
+def test_headless_import_does_not_load_tk():
+    code = "import sys, noise_daemon; sys.exit('tkinter' in sys.modules)"
+    root = os.path.dirname(sys.modules[NoiseDaemon.__module__].__file__)
+    assert subprocess.run([sys.executable, '-c', code], cwd=root).returncode == 0
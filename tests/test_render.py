@@ -0,0 +1,50 @@
+import tracemalloc
+import wave
+
+import numpy as np
+import pytest
+
+from brown_noise_player import CARRY_FRAMES, render, render_brown
+
+# Several chunks, each longer than the carry-in region, and a short last one.
+CHUNK = CARRY_FRAMES + 1000
+RATE = 8000
+DURATION = (3.5 * CHUNK) / RATE
+
+
+@pytest.mark.parametrize('suffix', ['.wav', '.pcm'])
+@pytest.mark.parametrize('channels', [1, 2])
+def test_brown_renders_match_for_any_worker_count(tmp_path, suffix, channels):
+    paths = [tmp_path / f'{name}{suffix}' for name in ('seq', 'one', 'two')]
+    common = dict(duration=DURATION, sample_rate=RATE, chunk_size=CHUNK,
+                  seed=7, channels=channels)
+    render(str(paths[0]), 'Brown', **common)
+    render_brown(str(paths[1]), workers=1, **common)
+    render_brown(str(paths[2]), workers=2, **common)
+    data = [p.read_bytes() for p in paths]
+    assert data[0] == data[1] == data[2]
+
+
+def test_brown_wav_header(tmp_path):
+    path = tmp_path / 'brown.wav'
+    render(str(path), 'Brown', duration=DURATION, sample_rate=RATE,
+           chunk_size=CHUNK, seed=1, channels=2)
+    with wave.open(str(path)) as wav:
+        assert wav.getnchannels() == 2
+        assert wav.getframerate() == RATE
+        assert wav.getnframes() == int(round(DURATION * RATE))
+        frames = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+    assert frames.any()
+
+
+def test_brown_memory_does_not_grow_with_duration(tmp_path):
+    chunks = 40
+    tracemalloc.start()
+    try:
+        render(str(tmp_path / 'long.pcm'), 'Brown', duration=chunks * CHUNK / RATE,
+               sample_rate=RATE, chunk_size=CHUNK, seed=3)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # A few float64 chunks at most, not one per chunk of the track.
+    assert peak < chunks // 4 * 8 * CHUNK
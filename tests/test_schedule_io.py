@@ -0,0 +1,14 @@
+import pytest
+
+from pomodoro_timer import read_schedule, write_schedule
+
+# What export_schedule snapshots: the text widget ends with a newline.
+TEXT = "00:00 Plan the day\n00:15 \n2026-10-17 09:15 Review, then lunch\n"
+
+
+@pytest.mark.parametrize('suffix', ['.txt', '.csv', '.json'])
+def test_export_round_trips_without_a_trailing_row(tmp_path, suffix):
+    lines = TEXT.splitlines()
+    path = str(tmp_path / f'schedule{suffix}')
+    write_schedule(path, lines)
+    assert list(read_schedule(path)) == lines